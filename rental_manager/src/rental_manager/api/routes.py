@@ -1,21 +1,28 @@
 """API routes for the rental manager."""
 
 from datetime import date, datetime
-from typing import Optional
+from pathlib import Path
+from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import AfterValidator, BaseModel
+from pydantic_core import PydanticCustomError
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 
 from rental_manager.config import settings
 from rental_manager.core.manager import RentalManager
+from rental_manager.db.database import get_session_context
+from rental_manager.db.models import AuditLog, Booking, Calendar, CodeAssignment, CodeSlot, Lock
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Dependency to get the manager instance
 _manager: Optional[RentalManager] = None
 
 
-def get_manager() -> RentalManager:
+async def get_manager() -> RentalManager:
     if _manager is None:
         raise HTTPException(status_code=500, detail="Manager not initialized")
     return _manager
@@ -28,14 +35,25 @@ def set_manager(manager: RentalManager) -> None:
 
 # Request/Response models
 
+def _check_four_digits(code: str) -> str:
+    if len(code) != 4 or not code.isdigit():
+        # A custom error type keeps the message free of pydantic's
+        # "Value error, " prefix, since the dashboard shows it as-is
+        raise PydanticCustomError("four_digit_code", "Code must be 4 digits")
+    return code
+
+
+# Validated while parsing the body (422 on mismatch)
+FourDigitCode = Annotated[str, AfterValidator(_check_four_digits)]
+
 
 class MasterCodeRequest(BaseModel):
-    code: str
+    code: FourDigitCode
 
 
 class EmergencyCodeRequest(BaseModel):
     lock_id: int
-    code: str
+    code: FourDigitCode
 
 
 class TimeOverrideRequest(BaseModel):
@@ -150,12 +168,12 @@ async def get_info():
 # Lock endpoints
 
 
-@router.get("/locks")
+@router.get("/locks", response_model=None)
 async def get_locks(
     manager: RentalManager = Depends(get_manager),
-):
+) -> ORJSONResponse:
     """Get all locks for this house."""
-    return await manager.get_locks()
+    return ORJSONResponse(await manager.get_locks())
 
 
 @router.get("/locks/{lock_entity_id}")
@@ -164,8 +182,7 @@ async def get_lock(
     manager: RentalManager = Depends(get_manager),
 ):
     """Get a specific lock by entity ID."""
-    locks = await manager.get_locks()
-    lock = next((l for l in locks if l["entity_id"] == lock_entity_id), None)
+    lock = await manager.get_lock(lock_entity_id)
     if not lock:
         raise HTTPException(status_code=404, detail="Lock not found")
     return lock
@@ -238,8 +255,6 @@ async def set_master_code(
     manager: RentalManager = Depends(get_manager),
 ):
     """Set the master code on all locks."""
-    if len(request.code) != 4 or not request.code.isdigit():
-        raise HTTPException(status_code=400, detail="Code must be 4 digits")
     return await manager.set_master_code(request.code)
 
 
@@ -265,8 +280,6 @@ async def set_emergency_code(
     manager: RentalManager = Depends(get_manager),
 ):
     """Set emergency code on a specific lock."""
-    if len(request.code) != 4 or not request.code.isdigit():
-        raise HTTPException(status_code=400, detail="Code must be 4 digits")
     return await manager.set_emergency_code(request.lock_id, request.code)
 
 
@@ -312,15 +325,15 @@ async def clear_slot_code(
 # Booking endpoints
 
 
-@router.get("/bookings")
+@router.get("/bookings", response_model=None)
 async def get_bookings(
     calendar_id: Optional[str] = Query(None, description="Filter by calendar ID"),
     from_date: Optional[date] = Query(None, description="Filter from date"),
     to_date: Optional[date] = Query(None, description="Filter to date"),
     manager: RentalManager = Depends(get_manager),
-):
+) -> ORJSONResponse:
     """Get bookings, optionally filtered."""
-    return await manager.get_bookings(calendar_id, from_date, to_date)
+    return ORJSONResponse(await manager.get_bookings(calendar_id, from_date, to_date))
 
 
 @router.get("/bookings/{booking_id}/lock-times")
@@ -386,29 +399,23 @@ async def set_booking_time_override(
 # Calendar endpoints
 
 
-@router.get("/calendars")
-async def get_calendars(manager: RentalManager = Depends(get_manager)):
+@router.get("/calendars", response_model=None)
+async def get_calendars(manager: RentalManager = Depends(get_manager)) -> ORJSONResponse:
     """Get all calendars."""
-    from rental_manager.db.database import get_session_context
-    from rental_manager.db.models import Calendar
-    from sqlalchemy import select
-
     async with get_session_context() as session:
-        result = await session.execute(select(Calendar))
-        calendars = result.scalars().all()
-        return [
-            {
-                "id": c.id,
-                "calendar_id": c.calendar_id,
-                "name": c.name,
-                "calendar_type": c.calendar_type,
-                "ical_url": c.ical_url,
-                "ha_entity_id": c.ha_entity_id,
-                "last_fetched": c.last_fetched.isoformat() if c.last_fetched else None,
-                "last_fetch_error": c.last_fetch_error,
-            }
-            for c in calendars
-        ]
+        result = await session.execute(
+            select(
+                Calendar.id,
+                Calendar.calendar_id,
+                Calendar.name,
+                Calendar.calendar_type,
+                Calendar.ical_url,
+                Calendar.ha_entity_id,
+                Calendar.last_fetched,
+                Calendar.last_fetch_error,
+            )
+        )
+        return ORJSONResponse([dict(row) for row in result.mappings()])
 
 
 @router.post("/calendars/refresh")
@@ -491,76 +498,66 @@ async def get_lock_unlock_history(
 # Audit log endpoint
 
 
-@router.get("/audit-log")
+@router.get("/audit-log", response_model=None)
 async def get_audit_log(
     limit: int = Query(100, le=1000),
     offset: int = Query(0),
     lock_id: Optional[int] = None,
     action: Optional[str] = None,
     manager: RentalManager = Depends(get_manager),
-):
+) -> ORJSONResponse:
     """Get the audit log."""
-    from rental_manager.db.database import get_session_context
-    from rental_manager.db.models import AuditLog, Booking, Calendar, Lock
-    from sqlalchemy import select
-    from sqlalchemy.orm import selectinload
-
-    async with get_session_context() as session:
-        query = select(AuditLog).order_by(AuditLog.timestamp.desc())
+    # Plain rows rather than ORM instances: this is a read-only listing.
+    # Lock names and booking info are joined in, so one query covers it.
+    query = (
+        select(
+            AuditLog.id,
+            AuditLog.timestamp,
+            AuditLog.action,
+            AuditLog.lock_id,
+            Lock.name.label("lock_name"),
+            AuditLog.booking_id,
+            Booking.guest_name,
+            Calendar.name.label("calendar_name"),
+            Booking.check_in_date.label("check_in"),
+            Booking.check_out_date.label("check_out"),
+            AuditLog.slot_number,
+            AuditLog.code,
+            AuditLog.details,
+            AuditLog.success,
+            AuditLog.error_message,
+            AuditLog.batch_id,
+        )
+        .outerjoin(Lock, AuditLog.lock_id == Lock.id)
+        .outerjoin(Booking, AuditLog.booking_id == Booking.id)
+        .outerjoin(Calendar, Booking.calendar_id == Calendar.id)
+        .order_by(AuditLog.timestamp.desc())
+    )
 
-        if lock_id:
-            query = query.where(AuditLog.lock_id == lock_id)
-        if action:
-            query = query.where(AuditLog.action == action)
+    if lock_id:
+        query = query.where(AuditLog.lock_id == lock_id)
+    if action:
+        query = query.where(AuditLog.action == action)
 
-        query = query.offset(offset).limit(limit)
+    query = query.offset(offset).limit(limit)
+    async with get_session_context() as session:
         result = await session.execute(query)
-        logs = result.scalars().all()
-
-        # Build lock name lookup
-        lock_ids = {log.lock_id for log in logs if log.lock_id}
-        lock_names = {}
-        if lock_ids:
-            lock_result = await session.execute(
-                select(Lock.id, Lock.name).where(Lock.id.in_(lock_ids))
-            )
-            lock_names = {row.id: row.name for row in lock_result}
-
-        # Build booking info lookup
-        booking_ids = {log.booking_id for log in logs if log.booking_id}
-        booking_info: dict = {}
-        if booking_ids:
-            booking_result = await session.execute(
-                select(Booking)
-                .options(selectinload(Booking.calendar))
-                .where(Booking.id.in_(booking_ids))
-            )
-            for b in booking_result.scalars():
-                booking_info[b.id] = {
-                    "guest_name": b.guest_name,
-                    "calendar_name": b.calendar.name if b.calendar else None,
-                    "check_in": b.check_in_date.isoformat(),
-                    "check_out": b.check_out_date.isoformat(),
-                }
+        logs = [dict(row) for row in result.mappings()]
+
+    for log in logs:
+        guest_name = log.pop("guest_name")
+        calendar_name = log.pop("calendar_name")
+        check_in = log.pop("check_in")
+        check_out = log.pop("check_out")
+        # check_in is non-nullable, so it's None only without a booking
+        log["booking"] = None if check_in is None else {
+            "guest_name": guest_name,
+            "calendar_name": calendar_name,
+            "check_in": check_in,
+            "check_out": check_out,
+        }
 
-        return [
-            {
-                "id": log.id,
-                "timestamp": log.timestamp.isoformat(),
-                "action": log.action,
-                "lock_id": log.lock_id,
-                "lock_name": lock_names.get(log.lock_id),
-                "booking_id": log.booking_id,
-                "booking": booking_info.get(log.booking_id),
-                "slot_number": log.slot_number,
-                "code": log.code,
-                "details": log.details,
-                "success": log.success,
-                "error_message": log.error_message,
-                "batch_id": log.batch_id,
-            }
-            for log in logs
-        ]
+    return ORJSONResponse(logs)
 
 
 @router.get("/logs")
@@ -569,8 +566,6 @@ async def get_logs(
     search: Optional[str] = None,
 ):
     """Read the persistent log file. Returns the last N lines."""
-    from pathlib import Path
-
     log_file = Path("/data/logs/rental_manager.log")
     if not log_file.exists():
         return {"lines": [], "total": 0}
@@ -585,11 +580,6 @@ async def get_logs(
 @router.get("/debug/assignments/{booking_id}")
 async def debug_assignments(booking_id: int):
     """Debug: show raw CodeAssignment data for a booking."""
-    from rental_manager.db.database import get_session_context
-    from rental_manager.db.models import CodeAssignment, CodeSlot, Lock
-    from sqlalchemy import select
-    from sqlalchemy.orm import joinedload
-
     async with get_session_context() as session:
         result = await session.execute(
             select(CodeAssignment)
@@ -619,8 +609,6 @@ async def get_ha_state(
     manager: RentalManager = Depends(get_manager),
 ):
     """Proxy to get a HA entity state. Useful for debugging."""
-    import httpx
-
     client = await manager._ha_client._get_client()
     url = f"{manager._ha_client.url}/api/states/{entity_id}"
     resp = await client.get(url)
@@ -633,8 +621,6 @@ async def search_ha_states(
     manager: RentalManager = Depends(get_manager),
 ):
     """Search HA entity states by keyword."""
-    import httpx
-
     client = await manager._ha_client._get_client()
     url = f"{manager._ha_client.url}/api/states"
     resp = await client.get(url)
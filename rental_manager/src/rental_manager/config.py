@@ -2,7 +2,7 @@
 
 from datetime import time
 from enum import Enum
-from typing import Any
+from typing import Any, NamedTuple
 
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -42,16 +42,24 @@ class CalendarType(str, Enum):
 # Slots 18-19: Whole house / Both houses (shared, mutually exclusive)
 # Slot 20: Emergency code
 
-SLOT_ASSIGNMENTS: dict[str, tuple[int, int]] = {
-    "room_1": (2, 3),
-    "room_2": (4, 5),
-    "room_3": (6, 7),
-    "room_4": (8, 9),
-    "room_5": (10, 11),
-    "room_6": (12, 13),
-    "suite_a": (14, 15),
-    "suite_b": (16, 17),
-    "whole_home": (18, 19),  # Shared between {house}vbr and 193195vbr
+
+class SlotPair(NamedTuple):
+    """The two slots a calendar uses on a lock (for back-to-back bookings)."""
+
+    a: int
+    b: int
+
+
+SLOT_ASSIGNMENTS: dict[str, SlotPair] = {
+    "room_1": SlotPair(2, 3),
+    "room_2": SlotPair(4, 5),
+    "room_3": SlotPair(6, 7),
+    "room_4": SlotPair(8, 9),
+    "room_5": SlotPair(10, 11),
+    "room_6": SlotPair(12, 13),
+    "suite_a": SlotPair(14, 15),
+    "suite_b": SlotPair(16, 17),
+    "whole_home": SlotPair(18, 19),  # Shared between {house}vbr and 193195vbr
 }
 
 MASTER_CODE_SLOT = 1
@@ -255,6 +263,17 @@ _CALENDAR_META: dict[str, tuple[str, CalendarType, list[int], str, str]] = {
     "193195vbr": ("193 & 195 Vauxhall Bridge Road (Both Houses)", CalendarType.BOTH_HOUSES, [1, 2, 3, 4, 5, 6], "calendar.193195vbr_calendar", "6574a2c7d05d645172420b44"),
 }
 
+# Whole-house and both-houses calendars (share the whole_home slots)
+WHOLE_HOME_CALENDAR_IDS = frozenset(
+    cal_id for cal_id, meta in _CALENDAR_META.items()
+    if meta[1] in (CalendarType.WHOLE_HOUSE, CalendarType.BOTH_HOUSES)
+)
+
+# Calendar ID suffix ("{house}_room_1" -> "room_1") -> (slot_a, slot_b)
+_SUFFIX_SLOTS: dict[str, SlotPair] = {
+    suffix: slots for suffix, slots in SLOT_ASSIGNMENTS.items() if suffix != "whole_home"
+}
+
 
 def build_calendars(house_code: str) -> list[CalendarConfig]:
     """Build calendar configuration for the given house.
@@ -286,32 +305,18 @@ def build_calendars(house_code: str) -> list[CalendarConfig]:
     return calendars
 
 
-def get_slot_for_calendar(calendar_id: str) -> tuple[int, int]:
+def get_slot_for_calendar(calendar_id: str) -> SlotPair:
     """Get the slot numbers for a calendar.
 
     Returns tuple of (slot_a, slot_b) for back-to-back booking support.
     """
-    # Extract the calendar type from the ID
-    if calendar_id.endswith("_room_1") or calendar_id == "195_room_1" or calendar_id == "193_room_1":
-        return SLOT_ASSIGNMENTS["room_1"]
-    elif calendar_id.endswith("_room_2"):
-        return SLOT_ASSIGNMENTS["room_2"]
-    elif calendar_id.endswith("_room_3"):
-        return SLOT_ASSIGNMENTS["room_3"]
-    elif calendar_id.endswith("_room_4"):
-        return SLOT_ASSIGNMENTS["room_4"]
-    elif calendar_id.endswith("_room_5"):
-        return SLOT_ASSIGNMENTS["room_5"]
-    elif calendar_id.endswith("_room_6"):
-        return SLOT_ASSIGNMENTS["room_6"]
-    elif calendar_id.endswith("_suite_a"):
-        return SLOT_ASSIGNMENTS["suite_a"]
-    elif calendar_id.endswith("_suite_b"):
-        return SLOT_ASSIGNMENTS["suite_b"]
-    elif calendar_id in ("195vbr", "193vbr", "193195vbr"):
+    if calendar_id in WHOLE_HOME_CALENDAR_IDS:
         return SLOT_ASSIGNMENTS["whole_home"]
-    else:
+    _, _, suffix = calendar_id.partition("_")
+    slots = _SUFFIX_SLOTS.get(suffix)
+    if slots is None:
         raise ValueError(f"Unknown calendar ID: {calendar_id}")
+    return slots
 
 
 # Global settings instance
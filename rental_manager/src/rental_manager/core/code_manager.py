@@ -1,8 +1,9 @@
 """Code generation and slot allocation."""
 
-import re
+from collections import defaultdict
 from dataclasses import dataclass
-from datetime import datetime, date, time, timedelta
+from datetime import date, datetime, time, timedelta
+from functools import cache
 from typing import Optional
 
 from rental_manager.config import (
@@ -10,10 +11,13 @@ from rental_manager.config import (
     EMERGENCY_CODE_SLOT,
     MASTER_CODE_SLOT,
     SLOT_ASSIGNMENTS,
+    WHOLE_HOME_CALENDAR_IDS,
     CalendarType,
     LockType,
+    SlotPair,
     get_slot_for_calendar,
 )
+from rental_manager.utils import digits_only
 
 
 def generate_code_from_phone(phone: Optional[str]) -> Optional[str]:
@@ -29,7 +33,7 @@ def generate_code_from_phone(phone: Optional[str]) -> Optional[str]:
         return None
 
     # Extract only digits
-    digits = re.sub(r"[^\d]", "", phone)
+    digits = digits_only(phone)
 
     if len(digits) < 4:
         return None
@@ -38,7 +42,7 @@ def generate_code_from_phone(phone: Optional[str]) -> Optional[str]:
     return digits[-4:]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SlotAllocation:
     """Represents the allocation of a code to a slot."""
 
@@ -52,7 +56,7 @@ class SlotAllocation:
     guest_name: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BookingCodeInfo:
     """Information needed to generate codes for a booking."""
 
@@ -69,15 +73,25 @@ class SlotAllocator:
     """Manages slot allocation for locks."""
 
     def __init__(self):
-        # Track which slots are in use: {(lock_entity_id, slot_number): booking_uid}
-        self._slot_usage: dict[tuple[str, int], str] = {}
+        # Track which slots are in use: {lock_entity_id: [booking_uid per slot]},
+        # indexed directly by slot number
+        self._slot_usage: defaultdict[str, list[Optional[str]]] = defaultdict(
+            lambda: [None] * (EMERGENCY_CODE_SLOT + 1)
+        )
+        # Reverse index: {lock_entity_id: {booking_uid: slot_number}}
+        self._booking_slots: defaultdict[str, dict[str, int]] = defaultdict(dict)
+        # calendar_id -> slot pair, resolved once per calendar
+        self._slot_ranges: dict[str, SlotPair] = {}
 
-    def get_calendar_slot_range(self, calendar_id: str) -> tuple[int, int]:
+    def get_calendar_slot_range(self, calendar_id: str) -> SlotPair:
         """Get the slot range for a calendar.
 
         Returns tuple of (slot_a, slot_b) for back-to-back booking support.
         """
-        return get_slot_for_calendar(calendar_id)
+        slots = self._slot_ranges.get(calendar_id)
+        if slots is None:
+            slots = self._slot_ranges[calendar_id] = get_slot_for_calendar(calendar_id)
+        return slots
 
     def allocate_slot_for_booking(
         self,
@@ -100,26 +114,25 @@ class SlotAllocator:
         Raises:
             ValueError: If no slots are available
         """
-        slot_a, slot_b = self.get_calendar_slot_range(calendar_id)
-
         # Check if this booking already has a slot
-        for slot in (slot_a, slot_b):
-            key = (lock_entity_id, slot)
-            if self._slot_usage.get(key) == booking_uid:
-                return slot
+        booking_slots = self._booking_slots[lock_entity_id]
+        slot = booking_slots.get(booking_uid)
+        if slot is not None:
+            return slot
+
+        slot_a, slot_b = self.get_calendar_slot_range(calendar_id)
+        usage = self._slot_usage[lock_entity_id]
+        uid_a = usage[slot_a]
+        uid_b = usage[slot_b]
 
         # Check if slot_a is free or has an expired booking
-        key_a = (lock_entity_id, slot_a)
-        uid_a = self._slot_usage.get(key_a)
         if uid_a is None or uid_a not in existing_booking_uids:
-            self._slot_usage[key_a] = booking_uid
+            self._assign(lock_entity_id, slot_a, booking_uid)
             return slot_a
 
         # Check if slot_b is free or has an expired booking
-        key_b = (lock_entity_id, slot_b)
-        uid_b = self._slot_usage.get(key_b)
         if uid_b is None or uid_b not in existing_booking_uids:
-            self._slot_usage[key_b] = booking_uid
+            self._assign(lock_entity_id, slot_b, booking_uid)
             return slot_b
 
         # Both slots are in use by active bookings
@@ -128,15 +141,40 @@ class SlotAllocator:
             f"Slot {slot_a} used by {uid_a}, slot {slot_b} used by {uid_b}."
         )
 
+    def _assign(self, lock_entity_id: str, slot_number: int, booking_uid: str) -> None:
+        """Give a slot to a booking, replacing any previous holder."""
+        usage = self._slot_usage[lock_entity_id]
+        booking_slots = self._booking_slots[lock_entity_id]
+        previous = usage[slot_number]
+        if previous is not None:
+            booking_slots.pop(previous, None)
+        usage[slot_number] = booking_uid
+        booking_slots[booking_uid] = slot_number
+
     def release_slot(self, lock_entity_id: str, slot_number: int) -> None:
         """Release a slot, making it available for reuse."""
-        key = (lock_entity_id, slot_number)
-        if key in self._slot_usage:
-            del self._slot_usage[key]
+        usage = self._slot_usage.get(lock_entity_id)
+        if usage is not None:
+            booking_uid = usage[slot_number]
+            usage[slot_number] = None
+            if booking_uid is not None:
+                self._booking_slots[lock_entity_id].pop(booking_uid, None)
 
     def clear_all(self) -> None:
         """Clear all slot allocations."""
         self._slot_usage.clear()
+        self._booking_slots.clear()
+
+
+@cache
+def _timing_offsets(lock_type: LockType, stagger_minutes: int) -> tuple[timedelta, timedelta]:
+    """Offsets from midnight of the check-in / check-out day, stagger included."""
+    timing = DEFAULT_TIMINGS[lock_type]
+    stagger = timedelta(minutes=stagger_minutes)
+    return (
+        datetime.combine(date.min, timing.activate) - datetime.min + stagger,
+        datetime.combine(date.min, timing.deactivate) - datetime.min + stagger,
+    )
 
 
 def calculate_code_times(
@@ -160,29 +198,27 @@ def calculate_code_times(
     Returns:
         Tuple of (activate_at, deactivate_at) datetimes
     """
-    timing = DEFAULT_TIMINGS[lock_type]
+    activate_offset, deactivate_offset = _timing_offsets(lock_type, stagger_minutes)
 
     # Calculate base activation time
     if override_activate:
         activate_at = override_activate
     else:
-        activate_at = datetime.combine(check_in_date, timing.activate)
-        activate_at += timedelta(minutes=stagger_minutes)
+        activate_at = datetime.combine(check_in_date, time.min) + activate_offset
 
     # Calculate base deactivation time
     if override_deactivate:
         deactivate_at = override_deactivate
     else:
         # Deactivation is on checkout date
-        deactivate_at = datetime.combine(check_out_date, timing.deactivate)
-        deactivate_at += timedelta(minutes=stagger_minutes)
+        deactivate_at = datetime.combine(check_out_date, time.min) + deactivate_offset
 
     return activate_at, deactivate_at
 
 
 def is_whole_home_calendar(calendar_id: str) -> bool:
     """Check if a calendar is a whole-home or both-houses calendar."""
-    return calendar_id in ("195vbr", "193vbr", "193195vbr")
+    return calendar_id in WHOLE_HOME_CALENDAR_IDS
 
 
 def calendars_share_slots(calendar_id_a: str, calendar_id_b: str) -> bool:
@@ -191,10 +227,8 @@ def calendars_share_slots(calendar_id_a: str, calendar_id_b: str) -> bool:
     This is true for whole-home calendars within the same house and 193195vbr.
     """
     # Whole home calendars share slots 18-19
-    whole_home_calendars = {"195vbr", "193vbr", "193195vbr"}
-
     # Check if both are whole-home type
-    if calendar_id_a in whole_home_calendars and calendar_id_b in whole_home_calendars:
+    if calendar_id_a in WHOLE_HOME_CALENDAR_IDS and calendar_id_b in WHOLE_HOME_CALENDAR_IDS:
         # 195vbr and 193195vbr share slots (on 195 locks)
         # 193vbr and 193195vbr share slots (on 193 locks)
         # But 195vbr and 193vbr don't affect each other (different houses)
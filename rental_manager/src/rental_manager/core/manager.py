@@ -5,7 +5,7 @@ import random
 import uuid
 from datetime import datetime, date, time, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 import logging
 
 from sqlalchemy import select
@@ -29,7 +29,7 @@ from rental_manager.core.code_manager import (
     generate_code_from_phone,
 )
 from rental_manager.core.ical_parser import ParsedBooking
-from rental_manager.core.sync_manager import SyncManager, SyncState
+from rental_manager.core.sync_manager import SyncManager, SyncState, wall_time
 from rental_manager.hosttools.client import HostToolsClient, parse_hosttools_reservations
 from rental_manager.db.database import get_session_context
 from rental_manager.db.models import (
@@ -160,6 +160,7 @@ class RentalManager:
         now = datetime.now()
         scheduled_count = 0
         deactivate_only_count = 0
+        entries: list[CodeScheduleEntry] = []
 
         async with get_session_context() as session:
             # Get all assignments that haven't fully expired yet
@@ -210,6 +211,7 @@ class RentalManager:
                             slot_number=slot_number,
                             booking_uid=booking.uid,
                             deactivate_at=assignment.deactivate_at,
+                            now=now,
                         )
                         deactivate_only_count += 1
                     else:
@@ -228,7 +230,7 @@ class RentalManager:
                             calendar_id=booking.calendar.calendar_id,
                             guest_name=booking.guest_name,
                         )
-                        self._scheduler.schedule_code(entry)
+                        entries.append(entry)
                         missed_count += 1
                 else:
                     # Activation is still in the future — schedule both.
@@ -242,9 +244,11 @@ class RentalManager:
                         calendar_id=booking.calendar.calendar_id,
                         guest_name=booking.guest_name,
                     )
-                    self._scheduler.schedule_code(entry)
+                    entries.append(entry)
                     scheduled_count += 1
 
+        self._scheduler.schedule_codes_bulk(entries, now=now)
+
         logger.info(
             f"Re-hydrated scheduler: {scheduled_count} future activations, "
             f"{deactivate_only_count} deactivations-only (already active), "
@@ -415,6 +419,7 @@ class RentalManager:
                     self._scheduler.schedule_whole_house_checkout_only(
                         booking_uid=booking.uid,
                         check_out_date=booking.check_out_date,
+                        now=now,
                     )
                 else:
                     # Future booking — schedule both
@@ -422,6 +427,7 @@ class RentalManager:
                         booking_uid=booking.uid,
                         check_in_date=booking.check_in_date,
                         check_out_date=booking.check_out_date,
+                        now=now,
                     )
                 wh_count += 1
 
@@ -496,10 +502,10 @@ class RentalManager:
         self._running = False
 
         if self._scheduler:
-            self._scheduler.stop()
+            await self._scheduler.stop()
 
         if self._sync_manager:
-            self._sync_manager.stop()
+            await self._sync_manager.stop()
 
         await self._event_listener.stop()
         await self._ha_client.close()
@@ -652,8 +658,9 @@ class RentalManager:
         # Try to find the booking via the sync manager's slot state
         booking_uid = None
         if self._sync_manager:
-            slot_sync = self._sync_manager.get_slot_state(lock_entity_id, slot_number)
-            booking_uid = slot_sync.booking_uid
+            slot_sync = self._sync_manager.find_slot_state(lock_entity_id, slot_number)
+            if slot_sync:
+                booking_uid = slot_sync.booking_uid
 
         # Log to audit
         async with get_session_context() as session:
@@ -1089,9 +1096,17 @@ class RentalManager:
             result = await session.execute(select(Calendar))
             calendars = result.scalars().all()
 
+            # Fetch every HostTools listing up front, concurrently
+            prefetched: dict[str, Any] = {}
+            if self._hosttools_client:
+                listing_ids = list(dict.fromkeys(
+                    c.hosttools_listing_id for c in calendars if c.hosttools_listing_id
+                ))
+                prefetched = await self._hosttools_client.get_all_reservations(listing_ids)
+
             for calendar in calendars:
                 try:
-                    bookings = await self._fetch_calendar_bookings(calendar)
+                    bookings = await self._fetch_calendar_bookings(calendar, prefetched)
                     if bookings is None:
                         continue  # No source configured
                     await self._process_calendar_bookings(session, calendar, bookings)
@@ -1113,18 +1128,28 @@ class RentalManager:
         logger.info("Calendar poll complete")
 
     async def _fetch_calendar_bookings(
-        self, calendar: Calendar
+        self, calendar: Calendar, prefetched: Optional[dict[str, Any]] = None,
     ) -> list[ParsedBooking] | None:
         """Fetch bookings from a calendar via HostTools API.
 
+        Args:
+            calendar: Calendar to fetch
+            prefetched: Optional result of get_all_reservations; used instead
+                of a fresh request when it covers this calendar's listing
+
         Returns None if HostTools is not configured for this calendar.
         """
         if not self._hosttools_client or not calendar.hosttools_listing_id:
             return None
 
-        reservations = await self._hosttools_client.get_reservations(
-            calendar.hosttools_listing_id
-        )
+        if prefetched is not None and calendar.hosttools_listing_id in prefetched:
+            reservations = prefetched[calendar.hosttools_listing_id]
+            if isinstance(reservations, BaseException):
+                raise reservations
+        else:
+            reservations = await self._hosttools_client.get_reservations(
+                calendar.hosttools_listing_id
+            )
         bookings = parse_hosttools_reservations(reservations)
         logger.debug(
             f"Fetched {len(bookings)} bookings from HostTools for {calendar.calendar_id}"
@@ -1596,8 +1621,21 @@ class RentalManager:
 
     async def get_locks(self) -> list[dict]:
         """Get all locks for this house (DB only — no HA polling)."""
+        return await self._query_locks()
+
+    async def get_lock(self, lock_entity_id: str) -> Optional[dict]:
+        """Get a single lock by entity ID (DB only — no HA polling).
+
+        Returns:
+            The lock in the same shape as get_locks(), or None if not found
+        """
+        locks = await self._query_locks(Lock.entity_id == lock_entity_id)
+        return locks[0] if locks else None
+
+    async def _query_locks(self, *criteria: Any) -> list[dict]:
+        """Load locks matching the given WHERE criteria with their slot info."""
         async with get_session_context() as session:
-            query = select(Lock).options(
+            query = select(Lock).where(*criteria).options(
                 selectinload(Lock.house),
                 selectinload(Lock.code_slots).selectinload(
                     CodeSlot.assignments
@@ -2924,7 +2962,10 @@ class RentalManager:
                     "lock_entity_id": s.lock_entity_id,
                     "slot_number": s.slot_number,
                     "state": s.state.value,
-                    "started_at": s.started_at.isoformat() if s.started_at else None,
+                    "started_at": (
+                        wall_time(s.started_at).isoformat()
+                        if s.started_at is not None else None
+                    ),
                 }
                 for s in syncing
             ],
@@ -2940,11 +2981,12 @@ class RentalManager:
         if not self._sync_manager:
             raise ValueError("Sync manager not initialized")
 
-        slot = self._sync_manager.get_slot_state(lock_entity_id, slot_number)
-        if slot.state != SyncState.FAILED:
+        slot = self._sync_manager.find_slot_state(lock_entity_id, slot_number)
+        if slot is None or slot.state != SyncState.FAILED:
+            state = slot.state if slot is not None else SyncState.IDLE
             raise ValueError(
                 f"Slot {lock_entity_id}:{slot_number} is not in failed state "
-                f"(current: {slot.state.value})"
+                f"(current: {state.value})"
             )
 
         target_code = slot.target_code
@@ -1,10 +1,15 @@
 """Code synchronization state machine and retry logic."""
 
 import asyncio
+import heapq
+import random
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Callable, Optional, Awaitable
+from functools import lru_cache
+from time import monotonic
+from types import MappingProxyType
+from typing import Callable, Mapping, Optional, Awaitable
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,7 +27,38 @@ class SyncState(str, Enum):
     FAILED = "failed"
 
 
-@dataclass
+# States of a slot with a set/clear in progress
+_IN_FLIGHT_STATES = frozenset({
+    SyncState.SETTING, SyncState.CLEARING, SyncState.CONFIRMING, SyncState.RETRYING,
+})
+# In-flight states subject to the sync timeout
+_TIMED_STATES = frozenset({SyncState.SETTING, SyncState.CLEARING, SyncState.CONFIRMING})
+# States reported as syncing, and that a confirmation completes
+_SYNCING_STATES = frozenset({SyncState.SETTING, SyncState.CONFIRMING, SyncState.RETRYING})
+
+_ERR_PING = "Lock not responding to ping"
+
+# Seconds a ping result is reused for further retries on the same lock
+PING_CACHE_SECONDS = 2.0
+
+
+def _error_text(exc: Exception) -> str:
+    """Error message for a slot, shared between slots failing alike."""
+    return _shared_text(str(exc))
+
+
+@lru_cache(maxsize=256)
+def _shared_text(text: str) -> str:
+    """Return the first-seen string equal to text, from a bounded cache."""
+    return text
+
+
+def wall_time(monotonic_ts: float) -> datetime:
+    """Convert a time.monotonic() timestamp to local wall-clock time."""
+    return datetime.now() - timedelta(seconds=monotonic() - monotonic_ts)
+
+
+@dataclass(slots=True)
 class SlotSync:
     """Synchronization state for a single slot."""
 
@@ -32,12 +68,14 @@ class SlotSync:
     target_code: Optional[str] = None
     current_code: Optional[str] = None
     booking_uid: Optional[str] = None
-    started_at: Optional[datetime] = None
+    started_at: Optional[float] = None  # time.monotonic() timestamp
+    next_attempt_at: Optional[float] = None  # when a RETRYING slot re-sets its code
+    gen: int = 0  # bumped for each deadline pushed, so older heap entries go stale
     retry_count: int = 0
     last_error: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class SyncResult:
     """Result of a sync operation."""
 
@@ -58,6 +96,9 @@ class SyncManager:
         on_sync_failed: Callable[[str, int, str, str], Awaitable[None]],
         timeout_seconds: int = 120,
         max_retries: int = 3,
+        base_delay: float = 2.0,
+        max_delay: float = 30.0,
+        jitter: float = 0.5,
     ):
         """Initialize the sync manager.
 
@@ -69,19 +110,49 @@ class SyncManager:
                 Args: (lock_entity_id, slot_number, code, error)
             timeout_seconds: Timeout before considering a sync stuck
             max_retries: Maximum retry attempts
+            base_delay: Delay in seconds between clearing a slot and re-setting
+                its code on the first retry (the first pause is base_delay to
+                base_delay * (1 + jitter), 2-3s by default); doubled on each
+                further retry
+            max_delay: Upper bound for the retry delay before jitter
+            jitter: Maximum fraction of random extra delay added to each retry
         """
         self._set_code = set_code
         self._clear_code = clear_code
         self._ping_lock = ping_lock
         self._on_sync_failed = on_sync_failed
-        self._timeout = timedelta(seconds=timeout_seconds)
+        self._timeout_s = float(timeout_seconds)
         self._max_retries = max_retries
+        self._max_retries_error = f"Max retries ({max_retries}) exceeded"
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._jitter = jitter
 
         # Track sync state per slot: {(lock_entity_id, slot_number): SlotSync}
         self._slots: dict[tuple[str, int], SlotSync] = {}
-
-        # Background task for checking timeouts
+        self._slots_view = MappingProxyType(self._slots)
+        # Keys of slots in _IN_FLIGHT_STATES / FAILED, kept in step by _set_state.
+        # Dicts serve as ordered sets so slots are listed in the order they
+        # entered the state, not in hash order.
+        self._in_flight_keys: dict[tuple[str, int], None] = {}
+        self._failed_keys: dict[tuple[str, int], None] = {}
+        # Min-heap of (deadline, key, gen); entries whose gen no longer
+        # matches the slot's, or whose slot has moved on, are skipped lazily
+        self._deadlines: list[tuple[float, tuple[str, int], int]] = []
+
+        # Retries are serialized per lock so slots on one lock don't stampede
+        # the Z-Wave mesh; recent ping results are shared between them
+        self._lock_locks: dict[str, asyncio.Lock] = {}
+        self._ping_cache: dict[str, tuple[float, bool]] = {}
+
+        # on_sync_failed runs in its own task so a slow notification doesn't
+        # hold up timeout handling for other slots
+        self._pending_callbacks: set[asyncio.Task] = set()
+
+        # Background task for checking timeouts; woken when a slot starts
+        # syncing so it can sleep until the earliest deadline in between
         self._check_task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
         self._running = False
 
     def start(self) -> None:
@@ -90,108 +161,268 @@ class SyncManager:
         self._check_task = asyncio.create_task(self._check_loop())
         logger.info("Sync manager started")
 
-    def stop(self) -> None:
-        """Stop the sync manager."""
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Stop the sync manager.
+
+        Args:
+            timeout: How long to wait for the check loop to exit, and then
+                for pending on_sync_failed callbacks
+        """
         self._running = False
-        if self._check_task:
-            self._check_task.cancel()
+        task = self._check_task
+        if task and not task.done():
+            task.cancel()
+            _, pending = await asyncio.wait({task}, timeout=timeout)
+            if pending:
+                logger.warning("Sync check loop did not stop within %.1fs", timeout)
+        self._check_task = None
+        if self._pending_callbacks:
+            _, pending = await asyncio.wait(self._pending_callbacks, timeout=timeout)
+            if pending:
+                logger.warning(
+                    "%d sync failure callbacks did not finish within %.1fs",
+                    len(pending), timeout,
+                )
         logger.info("Sync manager stopped")
 
     async def _check_loop(self) -> None:
-        """Background loop to check for stuck syncs."""
+        """Background loop to check for stuck syncs.
+
+        Sleeps until the earliest in-flight slot times out or is due to have
+        its code re-set, or until woken by a slot starting to sync; with
+        nothing in flight it just waits.
+        """
         while self._running:
+            self._wake.clear()
             try:
                 await self._check_timeouts()
             except Exception as e:
-                logger.error(f"Error in sync check loop: {e}")
-            await asyncio.sleep(30)  # Check every 30 seconds
+                logger.error("Error in sync check loop: %s", e)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._next_timeout_delay())
+            except TimeoutError:
+                pass
+
+    def _push_deadline(self, slot: SlotSync) -> None:
+        """Queue the slot's timeout or scheduled re-set, waking the check loop
+        if it is now the earliest."""
+        if slot.next_attempt_at is not None:
+            deadline = slot.next_attempt_at
+        else:
+            deadline = slot.started_at + self._timeout_s
+        slot.gen += 1
+        heapq.heappush(
+            self._deadlines, (deadline, (slot.lock_entity_id, slot.slot_number), slot.gen)
+        )
+        if self._deadlines[0][0] == deadline:
+            self._wake.set()
+
+    @staticmethod
+    def _is_pending(slot: SlotSync, gen: int) -> bool:
+        """Whether a heap entry still matches a pending timeout or re-set."""
+        if gen != slot.gen:
+            return False
+        if slot.next_attempt_at is not None:
+            return True
+        return slot.state in _TIMED_STATES and slot.started_at is not None
+
+    def _next_timeout_delay(self) -> Optional[float]:
+        """Seconds until the next slot timeout or scheduled re-set, or None if none."""
+        deadlines = self._deadlines
+        while deadlines:
+            deadline, key, gen = deadlines[0]
+            if self._is_pending(self._slots[key], gen):
+                return max(0.0, deadline - monotonic())
+            heapq.heappop(deadlines)
+        return None
 
     async def _check_timeouts(self) -> None:
-        """Check for stuck sync operations and retry."""
-        now = datetime.now()
+        """Check for stuck sync operations and retry.
 
-        for key, slot in list(self._slots.items()):
-            if slot.state not in (SyncState.SETTING, SyncState.CLEARING, SyncState.CONFIRMING):
-                continue
+        Due slots are handled concurrently; retries on the same lock are
+        still serialized by its per-lock asyncio.Lock.
+        """
+        now = monotonic()
+        deadlines = self._deadlines
+
+        due = []
+        while deadlines and deadlines[0][0] <= now:
+            _, key, gen = heapq.heappop(deadlines)
+            slot = self._slots[key]
+            if self._is_pending(slot, gen):
+                due.append(slot)
+        if not due:
+            return
 
-            if slot.started_at is None:
-                continue
+        results = await asyncio.gather(
+            *(self._handle_due(slot, now) for slot in due), return_exceptions=True
+        )
+        for slot, result in zip(due, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    "Error handling sync timeout on %s slot %d: %s",
+                    slot.lock_entity_id, slot.slot_number, result,
+                )
 
-            elapsed = now - slot.started_at
+    async def _handle_due(self, slot: SlotSync, now: float) -> None:
+        """Run a slot's scheduled re-set, or handle its sync timeout."""
+        if slot.next_attempt_at is not None:
+            await self._resume_retry(slot)
+            return
 
-            if elapsed > self._timeout:
-                logger.warning(
-                    f"Sync timeout on {slot.lock_entity_id} slot {slot.slot_number} "
-                    f"(state={slot.state}, elapsed={elapsed})"
-                )
-                await self._handle_timeout(slot)
+        elapsed = now - slot.started_at
+        logger.warning(
+            "Sync timeout on %s slot %d (state=%s, elapsed=%.0fs)",
+            slot.lock_entity_id, slot.slot_number, slot.state, elapsed,
+        )
+        await self._handle_timeout(slot)
+
+    def _callback_done(self, task: asyncio.Task) -> None:
+        """Forget a finished on_sync_failed task, logging any error it raised."""
+        self._pending_callbacks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Error in sync failure callback: %s", task.exception())
 
     async def _handle_timeout(self, slot: SlotSync) -> None:
         """Handle a timed-out sync operation."""
         if slot.retry_count >= self._max_retries:
             # Max retries exceeded, mark as failed
-            slot.state = SyncState.FAILED
-            slot.last_error = f"Max retries ({self._max_retries}) exceeded"
+            self._set_state(slot, SyncState.FAILED)
+            slot.last_error = self._max_retries_error
             logger.error(
-                f"Sync failed on {slot.lock_entity_id} slot {slot.slot_number}: "
-                f"{slot.last_error}"
+                "Sync failed on %s slot %d: %s",
+                slot.lock_entity_id, slot.slot_number, slot.last_error,
             )
-            await self._on_sync_failed(
+            task = asyncio.create_task(self._on_sync_failed(
                 slot.lock_entity_id,
                 slot.slot_number,
                 slot.target_code or "",
                 slot.last_error,
-            )
+            ))
+            self._pending_callbacks.add(task)
+            task.add_done_callback(self._callback_done)
             return
 
         # Attempt retry
-        slot.state = SyncState.RETRYING
+        self._set_state(slot, SyncState.RETRYING)
         slot.retry_count += 1
         logger.info(
-            f"Retrying sync on {slot.lock_entity_id} slot {slot.slot_number} "
-            f"(attempt {slot.retry_count}/{self._max_retries})"
+            "Retrying sync on %s slot %d (attempt %d/%d)",
+            slot.lock_entity_id, slot.slot_number, slot.retry_count, self._max_retries,
         )
 
+        async with self._lock_for(slot.lock_entity_id):
+            await self._retry_slot(slot)
+
+    def _lock_for(self, lock_entity_id: str) -> asyncio.Lock:
+        """Get the asyncio.Lock serializing retries on a lock."""
+        lock = self._lock_locks.get(lock_entity_id)
+        if lock is None:
+            lock = self._lock_locks[lock_entity_id] = asyncio.Lock()
+        return lock
+
+    async def _ping(self, lock_entity_id: str) -> bool:
+        """Ping a lock, reusing a result from the last PING_CACHE_SECONDS."""
+        now = monotonic()
+        pinged_at, ok = self._ping_cache.get(lock_entity_id, (0.0, False))
+        if now - pinged_at < PING_CACHE_SECONDS:
+            return ok
+        ok = await self._ping_lock(lock_entity_id)
+        self._ping_cache[lock_entity_id] = (monotonic(), ok)
+        return ok
+
+    def _retry_delay(self, retry_count: int) -> float:
+        """Backoff between clearing a slot and re-setting its code.
+
+        The pause gives the lock time to process the clear over Z-Wave before
+        the new code arrives; with base_delay=0 the re-set is scheduled
+        straight away without a timer.
+        """
+        delay = min(self._max_delay, self._base_delay * 2 ** (retry_count - 1))
+        return delay * (1 + random.uniform(0, self._jitter))
+
+    def _retry_failed(self, slot: SlotSync, error: str) -> None:
+        """Put a slot whose retry failed back under the sync timeout."""
+        slot.last_error = error
+        self._set_state(slot, SyncState.SETTING if slot.target_code else SyncState.CLEARING)
+        slot.started_at = monotonic()
+        self._push_deadline(slot)
+
+    async def _retry_slot(self, slot: SlotSync) -> None:
+        """Ping the lock and clear the slot, scheduling the re-set of its code."""
         try:
             # Step 1: Ping the lock
-            ping_success = await self._ping_lock(slot.lock_entity_id)
+            ping_success = await self._ping(slot.lock_entity_id)
             if not ping_success:
-                slot.last_error = "Lock not responding to ping"
-                logger.warning(f"Lock {slot.lock_entity_id} not responding")
-                slot.started_at = datetime.now()
+                logger.warning("Lock %s not responding", slot.lock_entity_id)
+                self._retry_failed(slot, _ERR_PING)
                 return
 
             # Step 2: Clear the slot
             await self._clear_code(slot.lock_entity_id, slot.slot_number)
-            await asyncio.sleep(2)  # Brief pause
 
-            # Step 3: Re-set the code if we have a target
-            if slot.target_code:
+        except Exception as e:
+            self._retry_failed(slot, _error_text(e))
+            logger.error(
+                "Error during retry on %s slot %d: %s", slot.lock_entity_id, slot.slot_number, e
+            )
+            return
+
+        if slot.target_code:
+            # Step 3: Re-set the code once the backoff delay has passed;
+            # the check loop picks the slot up again at next_attempt_at
+            slot.next_attempt_at = monotonic() + self._retry_delay(slot.retry_count)
+            self._push_deadline(slot)
+        else:
+            # We were clearing, and it should be clear now
+            self._set_state(slot, SyncState.IDLE)
+            slot.current_code = None
+            slot.started_at = None
+
+    async def _resume_retry(self, slot: SlotSync) -> None:
+        """Re-set the code of a slot cleared by a retry."""
+        async with self._lock_for(slot.lock_entity_id):
+            # A new set/clear or a confirmation may have overtaken the retry
+            if slot.state != SyncState.RETRYING or slot.next_attempt_at is None:
+                return
+            slot.next_attempt_at = None
+            try:
                 await self._set_code(
                     slot.lock_entity_id, slot.slot_number, slot.target_code
                 )
-                # Treat successful API call as confirmation
-                slot.state = SyncState.ACTIVE
-                slot.current_code = slot.target_code
-                slot.started_at = None
-                slot.last_error = None
-                logger.info(
-                    f"Code re-set successfully on {slot.lock_entity_id} slot {slot.slot_number} "
-                    f"(retry {slot.retry_count}/{self._max_retries})"
+            except Exception as e:
+                self._retry_failed(slot, _error_text(e))
+                logger.error(
+                    "Error during retry on %s slot %d: %s",
+                    slot.lock_entity_id, slot.slot_number, e,
                 )
-            else:
-                # We were clearing, and it should be clear now
-                slot.state = SyncState.IDLE
-                slot.current_code = None
-                slot.started_at = None
+                return
 
-        except Exception as e:
-            slot.last_error = str(e)
-            slot.started_at = datetime.now()
-            logger.error(
-                f"Error during retry on {slot.lock_entity_id} slot {slot.slot_number}: {e}"
+            # Treat successful API call as confirmation
+            self._set_state(slot, SyncState.ACTIVE)
+            slot.current_code = slot.target_code
+            slot.started_at = None
+            slot.last_error = None
+            logger.info(
+                "Code re-set successfully on %s slot %d (retry %d/%d)",
+                slot.lock_entity_id, slot.slot_number, slot.retry_count, self._max_retries,
             )
 
+    def _set_state(self, slot: SlotSync, state: SyncState) -> None:
+        """Move a slot to a new state, keeping the state indexes in step."""
+        slot.state = state
+        if state != SyncState.RETRYING:
+            slot.next_attempt_at = None
+        key = (slot.lock_entity_id, slot.slot_number)
+        if state in _IN_FLIGHT_STATES:
+            self._in_flight_keys[key] = None
+        else:
+            self._in_flight_keys.pop(key, None)
+        if state == SyncState.FAILED:
+            self._failed_keys[key] = None
+        else:
+            self._failed_keys.pop(key, None)
+
     def get_slot_state(self, lock_entity_id: str, slot_number: int) -> SlotSync:
         """Get the sync state for a slot.
 
@@ -203,11 +434,24 @@ class SyncManager:
             SlotSync state object
         """
         key = (lock_entity_id, slot_number)
-        if key not in self._slots:
-            self._slots[key] = SlotSync(
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = SlotSync(
                 lock_entity_id=lock_entity_id, slot_number=slot_number
             )
-        return self._slots[key]
+        return slot
+
+    def find_slot_state(self, lock_entity_id: str, slot_number: int) -> Optional[SlotSync]:
+        """Get the sync state for a slot without creating one.
+
+        Args:
+            lock_entity_id: Lock entity ID
+            slot_number: Slot number
+
+        Returns:
+            SlotSync state object, or None if the slot was never synced
+        """
+        return self._slots.get((lock_entity_id, slot_number))
 
     async def set_code(
         self, lock_entity_id: str, slot_number: int, code: str, booking_uid: str
@@ -226,32 +470,29 @@ class SyncManager:
         slot = self.get_slot_state(lock_entity_id, slot_number)
 
         # Update state
-        slot.state = SyncState.SETTING
+        self._set_state(slot, SyncState.SETTING)
         slot.target_code = code
         slot.booking_uid = booking_uid
-        slot.started_at = datetime.now()
+        slot.started_at = monotonic()
         slot.retry_count = 0
         slot.last_error = None
+        self._push_deadline(slot)
 
         try:
             await self._set_code(lock_entity_id, slot_number, code)
             # Treat a successful API call (HTTP 200) as confirmation.
             # We don't have a Z-Wave event listener to confirm the code
             # was actually programmed, so this is the best we can do.
-            slot.state = SyncState.ACTIVE
+            self._set_state(slot, SyncState.ACTIVE)
             slot.current_code = code
             slot.started_at = None
             slot.last_error = None
-            logger.info(
-                f"Code set successfully on {lock_entity_id} slot {slot_number}"
-            )
+            logger.info("Code set successfully on %s slot %d", lock_entity_id, slot_number)
             return SyncResult(success=True, state=slot.state)
         except Exception as e:
-            slot.last_error = str(e)
-            logger.error(
-                f"Error setting code on {lock_entity_id} slot {slot_number}: {e}"
-            )
-            return SyncResult(success=False, state=slot.state, error=str(e))
+            slot.last_error = _error_text(e)
+            logger.error("Error setting code on %s slot %d: %s", lock_entity_id, slot_number, e)
+            return SyncResult(success=False, state=slot.state, error=slot.last_error)
 
     async def clear_code(
         self, lock_entity_id: str, slot_number: int, booking_uid: str
@@ -269,26 +510,25 @@ class SyncManager:
         slot = self.get_slot_state(lock_entity_id, slot_number)
 
         # Update state
-        slot.state = SyncState.CLEARING
+        self._set_state(slot, SyncState.CLEARING)
         slot.target_code = None
         slot.booking_uid = booking_uid
-        slot.started_at = datetime.now()
+        slot.started_at = monotonic()
         slot.retry_count = 0
         slot.last_error = None
+        self._push_deadline(slot)
 
         try:
             await self._clear_code(lock_entity_id, slot_number)
             # Move to idle - clearing is typically confirmed immediately
-            slot.state = SyncState.IDLE
+            self._set_state(slot, SyncState.IDLE)
             slot.current_code = None
             slot.started_at = None
             return SyncResult(success=True, state=slot.state)
         except Exception as e:
-            slot.last_error = str(e)
-            logger.error(
-                f"Error clearing code on {lock_entity_id} slot {slot_number}: {e}"
-            )
-            return SyncResult(success=False, state=slot.state, error=str(e))
+            slot.last_error = _error_text(e)
+            logger.error("Error clearing code on %s slot %d: %s", lock_entity_id, slot_number, e)
+            return SyncResult(success=False, state=slot.state, error=slot.last_error)
 
     def confirm_code_set(self, lock_entity_id: str, slot_number: int) -> None:
         """Confirm that a code was successfully set.
@@ -300,24 +540,24 @@ class SyncManager:
             lock_entity_id: Lock entity ID
             slot_number: Slot number
         """
-        slot = self.get_slot_state(lock_entity_id, slot_number)
+        # Don't create state for slots we never synced
+        slot = self._slots.get((lock_entity_id, slot_number))
+        if slot is None or slot.state not in _SYNCING_STATES:
+            return
 
-        if slot.state in (SyncState.SETTING, SyncState.CONFIRMING, SyncState.RETRYING):
-            slot.state = SyncState.ACTIVE
-            slot.current_code = slot.target_code
-            slot.started_at = None
-            slot.last_error = None
-            logger.info(
-                f"Code confirmed on {lock_entity_id} slot {slot_number}"
-            )
+        self._set_state(slot, SyncState.ACTIVE)
+        slot.current_code = slot.target_code
+        slot.started_at = None
+        slot.last_error = None
+        logger.info("Code confirmed on %s slot %d", lock_entity_id, slot_number)
 
-    def get_all_states(self) -> dict[tuple[str, int], SlotSync]:
+    def get_all_states(self) -> Mapping[tuple[str, int], SlotSync]:
         """Get all slot sync states.
 
         Returns:
-            Dictionary mapping (lock_entity_id, slot_number) to SlotSync
+            Read-only live view mapping (lock_entity_id, slot_number) to SlotSync
         """
-        return dict(self._slots)
+        return self._slots_view
 
     def get_failed_slots(self) -> list[SlotSync]:
         """Get all slots in failed state.
@@ -325,7 +565,7 @@ class SyncManager:
         Returns:
             List of SlotSync objects in FAILED state
         """
-        return [slot for slot in self._slots.values() if slot.state == SyncState.FAILED]
+        return [self._slots[key] for key in self._failed_keys]
 
     def get_syncing_slots(self) -> list[SlotSync]:
         """Get all slots currently syncing.
@@ -333,10 +573,11 @@ class SyncManager:
         Returns:
             List of SlotSync objects in SETTING, CONFIRMING, or RETRYING state
         """
+        in_flight = [self._slots[key] for key in self._in_flight_keys]
         return [
             slot
-            for slot in self._slots.values()
-            if slot.state in (SyncState.SETTING, SyncState.CONFIRMING, SyncState.RETRYING)
+            for slot in in_flight
+            if slot.state in _SYNCING_STATES
         ]
 
     def reset_failed_slot(self, lock_entity_id: str, slot_number: int) -> None:
@@ -346,9 +587,9 @@ class SyncManager:
             lock_entity_id: Lock entity ID
             slot_number: Slot number
         """
-        slot = self.get_slot_state(lock_entity_id, slot_number)
-        if slot.state == SyncState.FAILED:
-            slot.state = SyncState.IDLE
+        slot = self._slots.get((lock_entity_id, slot_number))
+        if slot is not None and slot.state == SyncState.FAILED:
+            self._set_state(slot, SyncState.IDLE)
             slot.retry_count = 0
             slot.last_error = None
             slot.started_at = None
@@ -1,13 +1,16 @@
 """Home Assistant API client."""
 
+import asyncio
+import copy
 from dataclasses import dataclass
 from datetime import date, timedelta
+from time import monotonic
 from typing import Any, Optional
 
 import httpx
 
 
-@dataclass
+@dataclass(slots=True)
 class LockState:
     """State of a lock."""
 
@@ -18,7 +21,7 @@ class LockState:
     volume: Optional[str] = None  # "low", "high", "off"
 
 
-@dataclass
+@dataclass(slots=True)
 class CodeSlotState:
     """State of a code slot on a lock."""
 
@@ -28,25 +31,46 @@ class CodeSlotState:
     status: str  # "set", "unset", "adding", "deleting"
 
 
+# Request paths, relative to the client's base_url
+_SERVICE_PATH = "/api/services/%s/%s"
+_STATE_PATH = "/api/states/%s"
+_STATES_PATH = "/api/states"
+
+
 class HomeAssistantClient:
     """Client for communicating with Home Assistant API."""
 
-    def __init__(self, url: str, token: str, timeout: float = 30.0):
+    # How long cached reads stay valid (seconds). Entity states change often;
+    # registry entries rarely change outside of setup.
+    STATE_CACHE_TTL = 2.0
+    REGISTRY_CACHE_TTL = 60.0
+
+    def __init__(
+        self, url: str, token: str, timeout: float = 30.0, max_concurrency: int = 8
+    ):
         """Initialize the client.
 
         Args:
             url: Home Assistant URL (e.g., "http://192.168.1.100:8123")
             token: Long-lived access token
             timeout: Request timeout in seconds
+            max_concurrency: Maximum number of requests in flight at once
         """
         self.url = url.rstrip("/")
         self.token = token
         self.timeout = timeout
         self._client: Optional[httpx.AsyncClient] = None
+        # Bounds concurrent requests to HA
+        self._sem = asyncio.Semaphore(max_concurrency)
+        # Cleared if HA answers HEAD /api/ with 405, so health checks use GET
+        self._head_supported = True
+        # Short-lived read cache: {(method, key): (fetched_at, value)}
+        self._cache: dict[tuple[str, str], tuple[float, Any]] = {}
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None:
             self._client = httpx.AsyncClient(
+                base_url=self.url,
                 timeout=self.timeout,
                 headers={
                     "Authorization": f"Bearer {self.token}",
@@ -60,6 +84,23 @@ class HomeAssistantClient:
             await self._client.aclose()
             self._client = None
 
+    def _cache_get(self, key: tuple[str, str], ttl: float) -> Any:
+        entry = self._cache.get(key)
+        if entry is not None and monotonic() - entry[0] < ttl:
+            return entry[1]
+        return None
+
+    def _cache_set(self, key: tuple[str, str], value: Any) -> None:
+        self._cache[key] = (monotonic(), value)
+
+    def _invalidate(self, entity_id: Optional[str] = None) -> None:
+        """Drop cached reads affected by a write to entity_id (or everything)."""
+        if entity_id is None:
+            self._cache.clear()
+            return
+        self._cache.pop(("state", entity_id), None)
+        self._cache.pop(("entity_registry", entity_id), None)
+
     async def _call_service(
         self, domain: str, service: str, data: dict[str, Any]
     ) -> dict[str, Any]:
@@ -74,26 +115,44 @@ class HomeAssistantClient:
             Response data
         """
         client = await self._get_client()
-        response = await client.post(
-            f"{self.url}/api/services/{domain}/{service}",
-            json=data,
-        )
+        async with self._sem:
+            response = await client.post(
+                _SERVICE_PATH % (domain, service),
+                json=data,
+            )
+        entity_id = data.get("entity_id")
+        if isinstance(entity_id, str):
+            self._invalidate(entity_id)
         response.raise_for_status()
-        return response.json() if response.content else {}
+        try:
+            return response.json()
+        except ValueError:
+            # Some services return an empty 200
+            return {}
 
-    async def _get_state(self, entity_id: str) -> dict[str, Any]:
+    async def _get_state(self, entity_id: str, use_cache: bool = True) -> dict[str, Any]:
         """Get the state of an entity.
 
         Args:
             entity_id: Entity ID
+            use_cache: Whether a state read within STATE_CACHE_TTL may be reused
 
         Returns:
-            Entity state data
+            Entity state data. The dict is shared with the read cache, so
+            callers must treat it as read-only.
         """
+        if use_cache:
+            cached = self._cache_get(("state", entity_id), self.STATE_CACHE_TTL)
+            if cached is not None:
+                return cached
+
         client = await self._get_client()
-        response = await client.get(f"{self.url}/api/states/{entity_id}")
+        async with self._sem:
+            response = await client.get(_STATE_PATH % entity_id)
         response.raise_for_status()
-        return response.json()
+        data = response.json()
+        self._cache_set(("state", entity_id), data)
+        return data
 
     async def _get_states(self) -> list[dict[str, Any]]:
         """Get all entity states.
@@ -102,7 +161,8 @@ class HomeAssistantClient:
             List of entity state data
         """
         client = await self._get_client()
-        response = await client.get(f"{self.url}/api/states")
+        async with self._sem:
+            response = await client.get(_STATES_PATH)
         response.raise_for_status()
         return response.json()
 
@@ -265,14 +325,19 @@ class HomeAssistantClient:
         Args:
             entity_id: Lock entity ID
 
+        Uses the entity state Z-Wave JS already maintains instead of sending
+        a refresh to the lock, which costs a radio round trip (often >1s on
+        battery locks). Dead nodes are reported as "unavailable".
+
         Returns:
-            True if the lock responded
+            True if the lock is reachable
         """
         try:
-            await self.refresh_lock_usercodes(entity_id)
-            return True
+            # Always ask HA, so a liveness check never sees a stale state
+            data = await self._get_state(entity_id, use_cache=False)
         except Exception:
             return False
+        return data.get("state") not in (None, "unavailable", "unknown")
 
     async def get_calendar_events(
         self,
@@ -297,7 +362,7 @@ class HomeAssistantClient:
 
         client = await self._get_client()
         response = await client.get(
-            f"{self.url}/api/calendars/{entity_id}",
+            f"/api/calendars/{entity_id}",
             params={
                 "start": start.isoformat(),
                 "end": end.isoformat(),
@@ -308,23 +373,6 @@ class HomeAssistantClient:
 
     # Config entries API (for managing integrations like remote_calendar)
 
-    async def get_config_entries(self, domain: str) -> list[dict[str, Any]]:
-        """Get all config entries for a domain.
-
-        Args:
-            domain: Integration domain (e.g., "remote_calendar")
-
-        Returns:
-            List of config entry dicts with keys: entry_id, domain, title, state, etc.
-        """
-        client = await self._get_client()
-        response = await client.get(
-            f"{self.url}/api/config/config_entries/entry",
-            params={"domain": domain},
-        )
-        response.raise_for_status()
-        return response.json()
-
     async def delete_config_entry(self, entry_id: str) -> dict[str, Any]:
         """Delete a config entry.
 
@@ -336,8 +384,9 @@ class HomeAssistantClient:
         """
         client = await self._get_client()
         response = await client.delete(
-            f"{self.url}/api/config/config_entries/entry/{entry_id}",
+            f"/api/config/config_entries/entry/{entry_id}",
         )
+        self._invalidate()
         response.raise_for_status()
         return response.json()
 
@@ -357,12 +406,14 @@ class HomeAssistantClient:
             Config flow result dict with type, flow_id, result, etc.
         """
         client = await self._get_client()
+        self._invalidate()
 
         # Step 1: Initiate the config flow
-        init_response = await client.post(
-            f"{self.url}/api/config/config_entries/flow",
-            json={"handler": handler, "show_advanced_options": False},
-        )
+        async with self._sem:
+            init_response = await client.post(
+                "/api/config/config_entries/flow",
+                json={"handler": handler, "show_advanced_options": False},
+            )
         init_response.raise_for_status()
         flow = init_response.json()
 
@@ -371,10 +422,11 @@ class HomeAssistantClient:
             return flow  # Already completed or errored
 
         # Step 2: Submit the user step data
-        step_response = await client.post(
-            f"{self.url}/api/config/config_entries/flow/{flow_id}",
-            json=data,
-        )
+        async with self._sem:
+            step_response = await client.post(
+                f"/api/config/config_entries/flow/{flow_id}",
+                json=data,
+            )
         step_response.raise_for_status()
         return step_response.json()
 
@@ -389,7 +441,7 @@ class HomeAssistantClient:
         """
         client = await self._get_client()
         response = await client.post(
-            f"{self.url}/api/config/config_entries/entry/{entry_id}/reload",
+            f"/api/config/config_entries/entry/{entry_id}/reload",
         )
         return response.status_code == 200
 
@@ -400,14 +452,20 @@ class HomeAssistantClient:
             entity_id: Entity ID (e.g., "calendar.195_room_1")
 
         Returns:
-            Entity registry dict
+            Entity registry dict (a copy; the cached entry is never handed out)
         """
+        cached = self._cache_get(("entity_registry", entity_id), self.REGISTRY_CACHE_TTL)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
         client = await self._get_client()
         response = await client.get(
-            f"{self.url}/api/config/entity_registry/{entity_id}",
+            f"/api/config/entity_registry/{entity_id}",
         )
         response.raise_for_status()
-        return response.json()
+        entry = response.json()
+        self._cache_set(("entity_registry", entity_id), entry)
+        return copy.deepcopy(entry)
 
     async def update_entity_registry(
         self, entity_id: str, updates: dict[str, Any]
@@ -423,9 +481,11 @@ class HomeAssistantClient:
         """
         client = await self._get_client()
         response = await client.post(
-            f"{self.url}/api/config/entity_registry/{entity_id}",
+            f"/api/config/entity_registry/{entity_id}",
             json=updates,
         )
+        # Renames move the entity, so drop everything rather than one key
+        self._invalidate()
         response.raise_for_status()
         return response.json()
 
@@ -437,7 +497,13 @@ class HomeAssistantClient:
         """
         try:
             client = await self._get_client()
-            response = await client.get(f"{self.url}/api/")
+            if self._head_supported:
+                response = await client.head("/api/")
+                if response.status_code != 405:
+                    return response.status_code == 200
+                # This HA version doesn't route HEAD; use GET from now on
+                self._head_supported = False
+            response = await client.get("/api/")
             return response.status_code == 200
         except Exception:
             return False
@@ -1,10 +1,14 @@
 """Home Assistant WebSocket event listener for Z-Wave lock events."""
 
 import asyncio
-import json
 import logging
+import random
+import re
+import time
+from pathlib import Path
 from typing import Any, Callable, Coroutine, Optional
 
+import orjson
 import websockets
 
 logger = logging.getLogger(__name__)
@@ -23,6 +27,24 @@ ACCESS_CONTROL_EVENT_MAP = {
     11: ("keypad", "Keypad Lock (limited)"),
     12: ("keypad", "Keypad Unlock (limited)"),
 }
+_KNOWN_AC_CODES = frozenset(ACCESS_CONTROL_EVENT_MAP)
+
+# Static outgoing websocket messages, formatted with the message id only
+_SUBSCRIBE_NOTIFICATIONS_MSG = (
+    '{"id":%d,"type":"subscribe_events","event_type":"zwave_js_notification"}'
+)
+_ENTITY_REGISTRY_LIST_MSG = '{"id":%d,"type":"config/entity_registry/list"}'
+_SUBSCRIBE_REGISTRY_UPDATES_MSG = (
+    '{"id":%d,"type":"subscribe_events","event_type":"entity_registry_updated"}'
+)
+
+# http(s):// -> ws(s)://, applied once at the start of the HA URL
+_SCHEME_RE = re.compile(r"^http(s?)://")
+
+# On-disk copy of the device_id -> lock entity_id map, so reconnects can skip
+# the (potentially multi-MB) entity registry fetch while it is still fresh
+DEFAULT_ENTITY_MAP_CACHE = Path.home() / ".cache" / "rental_manager" / "entity_map.json"
+ENTITY_MAP_CACHE_TTL = 300.0
 
 
 class HAEventListener:
@@ -32,16 +54,33 @@ class HAEventListener:
         self,
         ha_url: str,
         ha_token: str,
-        on_lock_event: Callable[..., Coroutine],
+        on_lock_event: Callable[[str, Optional[int], str, str], Coroutine],
+        watch_state_changes: bool = False,
+        entity_map_cache: Optional[Path] = DEFAULT_ENTITY_MAP_CACHE,
     ):
-        self._ws_url = ha_url.replace("http://", "ws://").replace("https://", "wss://") + "/api/websocket"
+        self._ws_url = _SCHEME_RE.sub(r"ws\1://", ha_url, count=1) + "/api/websocket"
         self._token = ha_token
+        self._auth_msg = orjson.dumps({"type": "auth", "access_token": ha_token}).decode()
+        # Called positionally as (entity_id, code_slot, method, event_label)
         self._on_lock_event = on_lock_event
+        # Lock state changes are only logged today, so the subscription is opt-in
+        self._watch_state_changes = watch_state_changes
         self._task: Optional[asyncio.Task] = None
         self._running = False
         self._msg_id = 0
+        # Consecutive failed connection attempts (reset once subscribed)
+        self._reconnect_attempt = 0
         # Maps device_id -> lock entity_id (built at connect time)
         self._device_to_entity: dict[str, str] = {}
+        self._entity_map_cache = entity_map_cache
+        # Set by entity_registry_updated; the listen loop then refetches the registry
+        self._registry_refresh_needed = False
+        self._registry_request_id: Optional[int] = None
+        # Maps HA event_type -> handler
+        self._dispatch: dict[str, Callable[[dict[str, Any]], Coroutine]] = {
+            "zwave_js_notification": self._handle_zwave_notification,
+            "entity_registry_updated": self._handle_registry_updated,
+        }
 
     def _next_id(self) -> int:
         self._msg_id += 1
@@ -71,30 +110,41 @@ class HAEventListener:
         while self._running:
             try:
                 await self._connect_and_listen()
+                # Returning without a stop means auth or a subscription failed
+                reason: Any = "connection ended"
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                if self._running:
-                    logger.warning("HA websocket disconnected: %s, reconnecting in 10s...", e)
-                    await asyncio.sleep(10)
+                reason = e
+            if not self._running:
+                break
+            # Exponential backoff with jitter, capped at 60s
+            delay = min(60, 2 ** self._reconnect_attempt + random.random() * 2)
+            self._reconnect_attempt += 1
+            logger.warning(
+                "HA websocket disconnected: %s, reconnecting in %.1fs...", reason, delay,
+            )
+            await asyncio.sleep(delay)
 
     async def _connect_and_listen(self) -> None:
         """Connect to HA websocket, authenticate, and subscribe to events."""
         logger.info("Connecting to HA websocket at %s", self._ws_url)
 
+        # Message ids only need to be unique per connection
+        self._msg_id = 0
+        self._registry_refresh_needed = False
+        self._registry_request_id = None
+
         async with websockets.connect(self._ws_url, ping_interval=30, ping_timeout=10) as ws:
-            # HA sends auth_required
-            msg = json.loads(await ws.recv())
+            # Send auth straight away rather than waiting for HA's
+            # auth_required greeting; HA reads it once the greeting is out
+            await ws.send(self._auth_msg)
+            msg = orjson.loads(await ws.recv())
             if msg.get("type") != "auth_required":
                 logger.error("Unexpected first message: %s", msg)
                 return
 
-            # Authenticate
-            await ws.send(json.dumps({
-                "type": "auth",
-                "access_token": self._token,
-            }))
-            msg = json.loads(await ws.recv())
+            msg = orjson.loads(await ws.recv())
             if msg.get("type") != "auth_ok":
                 logger.error("HA auth failed: %s", msg)
                 return
@@ -103,51 +153,82 @@ class HAEventListener:
             # Build device_id -> entity_id mapping for lock entities
             await self._build_device_map(ws)
 
-            # Subscribe to zwave_js_notification events
-            sub_id = self._next_id()
-            await ws.send(json.dumps({
-                "id": sub_id,
-                "type": "subscribe_events",
-                "event_type": "zwave_js_notification",
-            }))
-            result = json.loads(await ws.recv())
-            if not result.get("success"):
-                logger.error("Failed to subscribe to zwave_js_notification: %s", result)
-                return
-            logger.info("Subscribed to zwave_js_notification events")
-
-            # Also subscribe to state_changed for lock entities (catches all lock/unlock)
-            state_sub_id = self._next_id()
-            await ws.send(json.dumps({
-                "id": state_sub_id,
-                "type": "subscribe_events",
-                "event_type": "state_changed",
-            }))
-            result = json.loads(await ws.recv())
-            if not result.get("success"):
-                logger.warning("Failed to subscribe to state_changed: %s", result)
-
-            # Listen for events
+            # Send the subscriptions back to back, then collect their results.
+            # Event frames for the first subscription can arrive before the
+            # later results, so results are matched by id.
+            notify_sub_id = self._next_id()
+            await ws.send(_SUBSCRIBE_NOTIFICATIONS_MSG % notify_sub_id)
+            pending = {notify_sub_id}
+
+            # Registry changes invalidate the cached device map
+            registry_sub_id = self._next_id()
+            await ws.send(_SUBSCRIBE_REGISTRY_UPDATES_MSG % registry_sub_id)
+            pending.add(registry_sub_id)
+
+            # Also watch state changes of lock entities (logged only).
+            # A state trigger filters HA-side so other entities never cross the wire.
+            lock_entities = sorted(set(self._device_to_entity.values()))
+            state_sub_id = None
+            if self._watch_state_changes and lock_entities:
+                state_sub_id = self._next_id()
+                await ws.send(orjson.dumps({
+                    "id": state_sub_id,
+                    "type": "subscribe_trigger",
+                    "trigger": {"platform": "state", "entity_id": lock_entities},
+                }).decode())
+                pending.add(state_sub_id)
+
+            while pending:
+                msg = orjson.loads(await ws.recv())
+                if msg.get("type") == "event":
+                    await self._handle_event(msg.get("event", {}))
+                    continue
+                msg_id = msg.get("id")
+                if msg_id not in pending:
+                    continue
+                pending.discard(msg_id)
+                if msg_id == notify_sub_id:
+                    if not msg.get("success"):
+                        logger.error("Failed to subscribe to zwave_js_notification: %s", msg)
+                        return
+                    logger.info("Subscribed to zwave_js_notification events")
+                elif msg_id == state_sub_id and not msg.get("success"):
+                    logger.warning("Failed to subscribe to lock state changes: %s", msg)
+                elif msg_id == registry_sub_id and not msg.get("success"):
+                    logger.warning("Failed to subscribe to entity registry updates: %s", msg)
+
+            # Fully connected; the next disconnect starts the backoff afresh
+            self._reconnect_attempt = 0
+
+            # Listen for events. Keepalive is handled by the websockets
+            # library (ping_interval/ping_timeout above); a dead connection
+            # raises ConnectionClosed and _listen_loop reconnects.
             while self._running:
-                try:
-                    raw = await asyncio.wait_for(ws.recv(), timeout=60)
-                    msg = json.loads(raw)
-                    if msg.get("type") == "event":
-                        await self._handle_event(msg.get("event", {}))
-                except asyncio.TimeoutError:
-                    # Send a ping to keep connection alive
-                    pong = self._next_id()
-                    await ws.send(json.dumps({"id": pong, "type": "ping"}))
-                    await asyncio.wait_for(ws.recv(), timeout=10)
+                msg = orjson.loads(await ws.recv())
+                msg_type = msg.get("type")
+                if msg_type == "event":
+                    await self._handle_event(msg.get("event", {}))
+                    if self._registry_refresh_needed and self._registry_request_id is None:
+                        self._registry_refresh_needed = False
+                        self._registry_request_id = self._next_id()
+                        await ws.send(_ENTITY_REGISTRY_LIST_MSG % self._registry_request_id)
+                elif msg_type == "result" and msg.get("id") == self._registry_request_id:
+                    self._registry_request_id = None
+                    self._apply_registry_result(msg)
 
     async def _build_device_map(self, ws) -> None:
-        """Fetch entity registry to build device_id -> lock entity_id mapping."""
-        reg_id = self._next_id()
-        await ws.send(json.dumps({
-            "id": reg_id,
-            "type": "config/entity_registry/list",
-        }))
-        result = json.loads(await ws.recv())
+        """Fetch entity registry to build device_id -> lock entity_id mapping.
+
+        The registry fetch is skipped when the on-disk cache is still fresh.
+        """
+        if self._load_entity_map_cache():
+            return
+
+        await ws.send(_ENTITY_REGISTRY_LIST_MSG % self._next_id())
+        self._apply_registry_result(orjson.loads(await ws.recv()))
+
+    def _apply_registry_result(self, result: dict[str, Any]) -> None:
+        """Rebuild the device map from a config/entity_registry/list result."""
         if not result.get("success"):
             logger.warning("Failed to fetch entity registry: %s", result)
             return
@@ -160,47 +241,116 @@ class HAEventListener:
                 self._device_to_entity[device_id] = entity_id
 
         logger.info("Built device map: %d lock entities", len(self._device_to_entity))
+        self._save_entity_map_cache()
 
-    async def _handle_event(self, event: dict[str, Any]) -> None:
-        """Handle an event from HA."""
-        event_type = event.get("event_type", "")
+    def _load_entity_map_cache(self) -> bool:
+        """Populate the device map from disk.
 
-        if event_type == "zwave_js_notification":
-            logger.debug("Raw zwave_js_notification: %s", json.dumps(event.get("data", {}))[:500])
-            await self._handle_zwave_notification(event)
-        elif event_type == "state_changed":
-            await self._handle_state_changed(event)
+        Returns:
+            True if the cache was loaded and is fresh enough to skip the fetch.
+        """
+        path = self._entity_map_cache
+        if path is None:
+            return False
+        try:
+            age = time.time() - path.stat().st_mtime
+            if age > ENTITY_MAP_CACHE_TTL:
+                return False
+            cached = orjson.loads(path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return False
+        if not isinstance(cached, dict) or not cached:
+            return False
 
-    async def _handle_zwave_notification(self, event: dict[str, Any]) -> None:
-        """Handle a Z-Wave JS notification event (lock access control)."""
-        data = event.get("data", {})
+        self._device_to_entity.clear()
+        self._device_to_entity.update(cached)
+        logger.info(
+            "Loaded device map from cache: %d lock entities (%.0fs old)",
+            len(self._device_to_entity), age,
+        )
+        return True
 
-        command_class = data.get("command_class")
-        command_class_name = data.get("command_class_name", "")
-        cc_type = data.get("type")
+    def _save_entity_map_cache(self) -> None:
+        """Write the device map to disk for the next reconnect."""
+        path = self._entity_map_cache
+        if path is None or not self._device_to_entity:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(orjson.dumps(self._device_to_entity))
+        except OSError as e:
+            logger.warning("Could not write entity map cache %s: %s", path, e)
+
+    def _invalidate_entity_map_cache(self) -> None:
+        """Drop the on-disk device map so the next connect refetches it."""
+        if self._entity_map_cache is None:
+            return
+        try:
+            self._entity_map_cache.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning("Could not remove entity map cache %s: %s", self._entity_map_cache, e)
+
+    async def _handle_registry_updated(self, event: dict[str, Any]) -> None:
+        """Handle entity_registry_updated events by refreshing the device map."""
+        data = event.get("data") or {}
+        entity_id = data.get("entity_id", "")
+        if not entity_id.startswith("lock."):
+            return
 
         logger.info(
-            "Z-Wave notification: cc=%s cc_name=%s type=%s event=%s params=%s",
-            command_class, command_class_name, cc_type,
-            data.get("event"), data.get("parameters"),
+            "Entity registry %s for %s, refreshing device map", data.get("action"), entity_id,
         )
+        self._invalidate_entity_map_cache()
+        # Picked up by the listen loop, which owns the socket
+        self._registry_refresh_needed = True
 
-        # Notification CC = 113 (0x71), Access Control type = 6
-        # Also accept command_class == 6 for backwards compat
-        if command_class not in (6, 113):
+    async def _handle_event(self, event: dict[str, Any]) -> None:
+        """Handle an event from HA."""
+        trigger = event.get("variables", {}).get("trigger")
+        if trigger is not None:
+            # subscribe_trigger events carry the state change under variables.trigger
+            await self._handle_state_changed({
+                "data": {
+                    "entity_id": trigger.get("entity_id", ""),
+                    "old_state": trigger.get("from_state"),
+                    "new_state": trigger.get("to_state"),
+                },
+            })
             return
 
-        # If command_class is 113, check that type is 6 (Access Control)
-        if command_class == 113 and cc_type != 6:
-            return
+        handler = self._dispatch.get(event.get("event_type", ""))
+        if handler is not None:
+            await handler(event)
+
+    async def _handle_zwave_notification(self, event: dict[str, Any]) -> None:
+        """Handle a Z-Wave JS notification event (lock access control)."""
+        data = event.get("data") or {}
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Raw zwave_js_notification: %s", orjson.dumps(data).decode()[:500])
+
+        command_class = data.get("command_class")
+        cc_type = data.get("type")
+        match command_class:
+            case 113 if cc_type == 6:
+                pass  # Notification CC (0x71), Access Control type
+            case 6:
+                pass  # Also accepted for backwards compat
+            case _:
+                return
 
         event_code = data.get("event")
-        event_info = ACCESS_CONTROL_EVENT_MAP.get(event_code)
-        if not event_info:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Z-Wave notification: cc=%s cc_name=%s type=%s event=%s params=%s",
+                command_class, data.get("command_class_name", ""), cc_type,
+                event_code, data.get("parameters"),
+            )
+
+        if event_code not in _KNOWN_AC_CODES:
             logger.debug("Unknown access control event code: %s", event_code)
             return
 
-        method, label = event_info
+        method, label = ACCESS_CONTROL_EVENT_MAP[event_code]
 
         # Get entity_id - resolve from device_id if needed
         entity_id = data.get("entity_id")
@@ -226,24 +376,16 @@ class HAEventListener:
         )
 
         try:
-            await self._on_lock_event(
-                entity_id=entity_id,
-                code_slot=code_slot,
-                method=method,
-                event_label=label,
-            )
+            await self._on_lock_event(entity_id, code_slot, method, label)
         except Exception as e:
             logger.error("Error processing lock event: %s", e)
 
     async def _handle_state_changed(self, event: dict[str, Any]) -> None:
         """Handle state_changed events for lock entities (fallback)."""
+        # The state trigger subscription is scoped to lock entities HA-side
         data = event.get("data", {})
         entity_id = data.get("entity_id", "")
 
-        # Only care about lock entities
-        if not entity_id.startswith("lock."):
-            return
-
         old_state = data.get("old_state", {})
         new_state = data.get("new_state", {})
 
@@ -1,13 +1,15 @@
 """HostTools API client for fetching reservations directly."""
 
-import re
+import asyncio
 from datetime import date, timedelta
 from typing import Any, Optional
 import logging
 
 import httpx
+import orjson
 
 from rental_manager.core.ical_parser import ParsedBooking
+from rental_manager.utils import digits_only
 
 logger = logging.getLogger(__name__)
 
@@ -23,9 +25,13 @@ class HostToolsClient:
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
+            # HTTP/2 multiplexes the per-listing reservation requests over
+            # a single connection to the HostTools API
             self._client = httpx.AsyncClient(
                 headers={"authToken": self._auth_token},
                 timeout=30.0,
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60),
             )
         return self._client
 
@@ -38,7 +44,7 @@ class HostToolsClient:
         client = await self._get_client()
         response = await client.get(f"{BASE_URL}/getlistings")
         response.raise_for_status()
-        return response.json().get("listings", [])
+        return orjson.loads(response.content).get("listings", [])
 
     async def get_reservations(
         self,
@@ -65,7 +71,30 @@ class HostToolsClient:
         url = f"{BASE_URL}/getreservations/{listing_id}/{start.isoformat()}/{end.isoformat()}"
         response = await client.get(url)
         response.raise_for_status()
-        return response.json().get("reservations", [])
+        return orjson.loads(response.content).get("reservations", [])
+
+    async def get_all_reservations(
+        self,
+        listing_ids: list[str],
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> dict[str, list[dict[str, Any]] | BaseException]:
+        """Get reservations for several listings concurrently.
+
+        Args:
+            listing_ids: HostTools listing IDs
+            start: Start date (see get_reservations)
+            end: End date (see get_reservations)
+
+        Returns:
+            Dict of listing ID to its reservations, or to the exception raised
+            while fetching that listing so one failure doesn't sink the rest.
+        """
+        results = await asyncio.gather(
+            *(self.get_reservations(listing_id, start, end) for listing_id in listing_ids),
+            return_exceptions=True,
+        )
+        return dict(zip(listing_ids, results))
 
 
 def parse_hosttools_reservations(
@@ -95,7 +124,7 @@ def parse_hosttools_reservations(
 
         # Phone — strip to digits only
         raw_phone = res.get("phone") or ""
-        phone = re.sub(r"[^\d]", "", raw_phone) or None
+        phone = digits_only(raw_phone) or None
 
         # Channel / source
         channel = res.get("source")  # e.g. "Airbnb", "internal", "Booking.com"
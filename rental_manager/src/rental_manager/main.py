@@ -1,6 +1,6 @@
 """Main application entry point."""
 
-import json
+import hashlib
 import logging
 from contextlib import asynccontextmanager
 from datetime import datetime
@@ -11,9 +11,9 @@ from typing import Optional
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse, Response
 from pydantic import BaseModel
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from rental_manager.api.routes import router as api_router, set_manager
 from rental_manager.config import settings
@@ -25,6 +25,11 @@ WEB_DIR = Path(__file__).parent / "web"
 STATIC_DIR = WEB_DIR / "static"
 TEMPLATES_DIR = WEB_DIR / "templates"
 
+# The dashboard is a single static page; read it once and serve from memory
+INDEX_HTML = (TEMPLATES_DIR / "index.html").read_bytes()
+INDEX_ETAG = f'"{hashlib.blake2b(INDEX_HTML, digest_size=8).hexdigest()}"'
+INDEX_HEADERS = {"ETag": INDEX_ETAG, "Cache-Control": "public, max-age=60"}
+
 # Configure logging
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 log_level = logging.DEBUG if settings.debug else logging.INFO
@@ -49,21 +54,40 @@ logger = logging.getLogger(__name__)
 manager: RentalManager | None = None
 
 
-class IngressMiddleware(BaseHTTPMiddleware):
+_INGRESS_HEADER = b"x-ingress-path"
+
+
+class IngressMiddleware:
     """Middleware to handle HA ingress path rewriting.
 
     When running behind HA ingress, the X-Ingress-Path header contains
     the base path (e.g., /api/hassio_ingress/abc123). We strip this
     prefix from the request path so our routes match correctly.
+
+    Implemented as plain ASGI so requests don't go through
+    BaseHTTPMiddleware's per-request task and stream plumbing.
     """
 
-    async def dispatch(self, request: Request, call_next):
-        ingress_path = request.headers.get("X-Ingress-Path", "")
-        if ingress_path and request.url.path.startswith(ingress_path):
-            # Strip the ingress prefix
-            new_path = request.url.path[len(ingress_path):] or "/"
-            request.scope["path"] = new_path
-        return await call_next(request)
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # The ingress prefix is fixed per deployment, so remember the last
+        # raw header value and its decoded form
+        self._last_raw_prefix = b""
+        self._last_prefix = ""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            for key, value in scope["headers"]:
+                if key == _INGRESS_HEADER:
+                    if value != self._last_raw_prefix:
+                        self._last_raw_prefix = value
+                        self._last_prefix = value.decode("latin-1")
+                    ingress_path = self._last_prefix
+                    if ingress_path and scope["path"].startswith(ingress_path):
+                        # Strip the ingress prefix
+                        scope["path"] = scope["path"][len(ingress_path):] or "/"
+                    break
+        await self.app(scope, receive, send)
 
 
 @asynccontextmanager
@@ -100,6 +124,7 @@ app = FastAPI(
     description=f"Lock code manager for {settings.house_code} Vauxhall Bridge Road",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add ingress middleware (must be before other middleware)
@@ -121,19 +146,24 @@ app.include_router(api_router, prefix="/api")
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
 
+def _index_response(request: Request) -> Response:
+    """Serve the cached dashboard page, or 304 if the client has it."""
+    if request.headers.get("if-none-match") == INDEX_ETAG:
+        return Response(status_code=304, headers=INDEX_HEADERS)
+    return HTMLResponse(content=INDEX_HTML, headers=INDEX_HEADERS)
+
+
 # Dashboard endpoint
 @app.get("/", response_class=HTMLResponse)
-async def dashboard():
+async def dashboard(request: Request):
     """Serve the dashboard."""
-    index_path = TEMPLATES_DIR / "index.html"
-    return FileResponse(index_path)
+    return _index_response(request)
 
 
 @app.get("/dashboard", response_class=HTMLResponse)
-async def dashboard_redirect():
+async def dashboard_redirect(request: Request):
     """Serve the dashboard."""
-    index_path = TEMPLATES_DIR / "index.html"
-    return FileResponse(index_path)
+    return _index_response(request)
 
 
 class LockEventPayload(BaseModel):
@@ -146,6 +176,17 @@ class LockEventPayload(BaseModel):
     timestamp: Optional[str] = None
 
 
+# Event label keywords -> unlock method, checked in order (first match wins)
+_LABEL_METHODS = (
+    ("keypad", "keypad"),
+    ("manual", "manual"),
+    ("thumb", "manual"),
+    ("auto", "auto_lock"),
+    ("rf", "rf"),
+    ("remote", "rf"),
+)
+
+
 @app.post("/webhooks/lock-event")
 async def webhook_lock_event(payload: LockEventPayload):
     """Receive lock unlock events from HA automation.
@@ -165,23 +206,15 @@ async def webhook_lock_event(payload: LockEventPayload):
             pass
 
     # Determine method from event label
-    method = "unknown"
     label = (payload.event_label or "").lower()
-    if "keypad" in label:
-        method = "keypad"
-    elif "manual" in label or "thumb" in label:
-        method = "manual"
-    elif "auto" in label:
-        method = "auto_lock"
-    elif "rf" in label or "remote" in label:
-        method = "rf"
+    method = next((m for needle, m in _LABEL_METHODS if needle in label), "unknown")
 
     result = await manager.record_unlock_event(
         entity_id=payload.entity_id,
         code_slot=payload.code_slot,
         method=method,
         timestamp=ts,
-        raw_details=json.dumps(payload.model_dump(), default=str),
+        raw_details=payload.model_dump_json(),
     )
     return result
 
@@ -1,19 +1,35 @@
 """Time scheduler for code activation and deactivation."""
 
 import asyncio
+import weakref
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import date, datetime, time
 from enum import Enum
-from typing import Callable, Optional, Awaitable
+from functools import lru_cache
+from time import monotonic
+from typing import Callable, Iterable, Optional, Awaitable
 import logging
 
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_REMOVED,
+    JobEvent,
+)
+from apscheduler.jobstores.base import ConflictingIdError, JobLookupError
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.schedulers.base import STATE_RUNNING
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
 logger = logging.getLogger(__name__)
 
+# Whole-house routine times on check-in / check-out day
+WH_CHECKIN_TIME = time(14, 30)
+WH_CHECKOUT_TIME = time(11, 30)
+
 
 class JobType(str, Enum):
     """Type of scheduled job."""
@@ -26,7 +42,7 @@ class JobType(str, Enum):
     WHOLE_HOUSE_CHECKOUT = "whole_house_checkout"
 
 
-@dataclass
+@dataclass(slots=True)
 class ScheduledJob:
     """Information about a scheduled job."""
 
@@ -40,7 +56,7 @@ class ScheduledJob:
     calendar_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CodeScheduleEntry:
     """Entry for a scheduled code activation or deactivation."""
 
@@ -54,12 +70,50 @@ class CodeScheduleEntry:
     guest_name: str
 
 
+@lru_cache(maxsize=2048)
+def activate_job_id(lock_entity_id: str, slot_number: int, booking_uid: str) -> str:
+    """Job ID for a code activation (cached across repeated polls)."""
+    return f"activate_{lock_entity_id}_{slot_number}_{booking_uid}"
+
+
+@lru_cache(maxsize=2048)
+def deactivate_job_id(lock_entity_id: str, slot_number: int, booking_uid: str) -> str:
+    """Job ID for a code deactivation (cached across repeated polls)."""
+    return f"deactivate_{lock_entity_id}_{slot_number}_{booking_uid}"
+
+
+# Live schedulers by id. APScheduler jobs call the module-level _run_job with
+# a scheduler id and handler name instead of holding bound methods, so job
+# definitions stay picklable if a persistent job store is ever used.
+_SCHEDULERS: "weakref.WeakValueDictionary[int, CodeScheduler]" = weakref.WeakValueDictionary()
+
+
+async def _run_job(scheduler_id: int, handler_name: str, *args) -> None:
+    """APScheduler entry point: run a handler on a live CodeScheduler."""
+    scheduler = _SCHEDULERS.get(scheduler_id)
+    if scheduler is None:
+        logger.warning("Dropping %s job for a scheduler that no longer exists", handler_name)
+        return
+    await getattr(scheduler, handler_name)(*args)
+
+
 class CodeScheduler:
     """Manages scheduling of code activations and deactivations."""
 
-    # Delay between consecutive catch-up Z-Wave operations (seconds).
+    # Minimum spacing between the starts of consecutive catch-up Z-Wave
+    # operations on the same lock (seconds). Different locks are separate
+    # mesh nodes and are caught up in parallel.
     CATCHUP_STAGGER = 8
 
+    # Idle time after which the catch-up consumer exits (seconds); it is
+    # restarted by the next past-due operation.
+    CATCHUP_IDLE_TIMEOUT = 60
+
+    # Back-off cap after consecutive catch-up failures (seconds), and how
+    # often to log an error within a run of failures.
+    CATCHUP_MAX_BACKOFF = 60
+    CATCHUP_ERROR_LOG_EVERY = 10
+
     def __init__(
         self,
         on_activate: Callable[[str, int, str, str], Awaitable[None]],
@@ -98,18 +152,47 @@ class CodeScheduler:
         self._poll_interval = poll_interval_seconds
 
         self._scheduler = AsyncIOScheduler()
+        self._id = id(self)
+        _SCHEDULERS[self._id] = self
         self._scheduled_jobs: dict[str, ScheduledJob] = {}
-
-        # Queue for catch-up operations processed sequentially with stagger.
-        self._catchup_queue: asyncio.Queue[tuple] = asyncio.Queue()
+        # Secondary indexes into _scheduled_jobs (job ids per lock / booking)
+        self._jobs_by_lock: defaultdict[str, set[str]] = defaultdict(set)
+        self._jobs_by_booking: defaultdict[str, set[str]] = defaultdict(set)
+
+        # Catch-up operations processed sequentially with stagger. The event
+        # wakes the consumer when the deque goes from empty to non-empty.
+        self._catchup_deque: deque[tuple] = deque()
+        self._catchup_event = asyncio.Event()
         self._catchup_task: Optional[asyncio.Task] = None
+        # Shared across locks: a failing Z-Wave mesh affects all of them
+        self._consecutive_failures = 0
+        self._backoff_until = 0.0
+        # Catch-up op type -> callback. The callbacks are called directly
+        # rather than through the _handle_* wrappers, so their failures reach
+        # the catch-up back-off.
+        self._catchup_dispatch: dict[str, Callable[..., Awaitable[None]]] = {
+            op_type: callback
+            for op_type, callback in (
+                ("activate", on_activate),
+                ("deactivate", on_deactivate),
+                ("finalize", on_code_finalize),
+                ("wh_checkin", on_whole_house_checkin),
+                ("wh_checkout", on_whole_house_checkout),
+            )
+            if callback is not None
+        }
 
     def start(self) -> None:
         """Start the scheduler."""
-        # Add recurring calendar poll job
+        # Add recurring calendar poll job, jittered by up to 10% so it
+        # doesn't stay aligned with other periodic work
         self._scheduler.add_job(
-            self._handle_calendar_poll,
-            IntervalTrigger(seconds=self._poll_interval),
+            _run_job,
+            IntervalTrigger(
+                seconds=self._poll_interval,
+                jitter=max(1, self._poll_interval // 10),
+            ),
+            args=[self._id, "_handle_calendar_poll"],
             id="calendar_poll",
             replace_existing=True,
         )
@@ -117,53 +200,141 @@ class CodeScheduler:
         # Weekly emergency code rotation - every Monday at 3am
         if self._on_emergency_rotate:
             self._scheduler.add_job(
-                self._handle_emergency_rotate,
+                _run_job,
                 CronTrigger(day_of_week="mon", hour=3, minute=0),
+                args=[self._id, "_handle_emergency_rotate"],
                 id="emergency_rotate",
                 replace_existing=True,
             )
 
+        # Drop our shadow copy of a job once APScheduler is done with it
+        self._scheduler.add_listener(
+            self._on_job_event, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_REMOVED,
+        )
+
         self._scheduler.start()
 
-        # Start catch-up queue processor
-        self._catchup_task = asyncio.create_task(self._process_catchup_queue())
+        # The catch-up processor is started on demand; pick up anything
+        # queued before start()
+        if self._catchup_deque:
+            self._ensure_catchup_consumer()
 
         logger.info("Scheduler started")
 
-    def stop(self) -> None:
-        """Stop the scheduler."""
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Stop the scheduler.
+
+        Args:
+            timeout: How long to wait for the catch-up processor to exit
+        """
         self._scheduler.shutdown(wait=False)
-        if self._catchup_task:
-            self._catchup_task.cancel()
+        task = self._catchup_task
+        if task and not task.done():
+            task.cancel()
+            _, pending = await asyncio.wait({task}, timeout=timeout)
+            if pending:
+                logger.warning("Catch-up processor did not stop within %.1fs", timeout)
+        self._catchup_task = None
         logger.info("Scheduler stopped")
 
     async def _process_catchup_queue(self) -> None:
-        """Process catch-up operations sequentially with stagger delays.
+        """Process catch-up operations with stagger delays.
 
         Past-due activations/deactivations are queued here instead of being
         fired concurrently, preventing Z-Wave mesh flooding on startup.
+        Operations are grouped per lock: each lock's operations run in order,
+        CATCHUP_STAGGER apart (measured start to start), while different
+        locks are caught up concurrently. Operations not tied to a single
+        lock (finalize, whole-house routines) run first and on their own:
+        the whole-house routines drive every internal lock, and finalizing
+        a code must not race its activation.
         """
+        # Earliest start time of the next operation, per lock
+        deadlines: dict[Optional[str], float] = {}
         while True:
             try:
-                op_type, args = await self._catchup_queue.get()
-                if op_type == "activate":
-                    await self._handle_activate(*args)
-                elif op_type == "deactivate":
-                    await self._handle_deactivate(*args)
-                elif op_type == "finalize":
-                    await self._handle_finalize(*args)
-                elif op_type == "wh_checkin":
-                    await self._handle_whole_house_checkin(*args)
-                elif op_type == "wh_checkout":
-                    await self._handle_whole_house_checkout(*args)
-                self._catchup_queue.task_done()
-                # Stagger between operations to avoid overwhelming Z-Wave
-                if not self._catchup_queue.empty():
-                    await asyncio.sleep(self.CATCHUP_STAGGER)
+                if not self._catchup_deque:
+                    self._catchup_event.clear()
+                    try:
+                        await asyncio.wait_for(
+                            self._catchup_event.wait(), timeout=self.CATCHUP_IDLE_TIMEOUT,
+                        )
+                    except TimeoutError:
+                        # Nothing past-due for a while; exit until needed again
+                        self._catchup_task = None
+                        return
+
+                unlocked_ops: list[tuple] = []
+                groups: dict[str, list[tuple]] = {}
+                while self._catchup_deque:
+                    op_type, args = self._catchup_deque.popleft()
+                    if op_type in ("activate", "deactivate"):
+                        groups.setdefault(args[0], []).append((op_type, args))
+                    else:
+                        unlocked_ops.append((op_type, args))
+
+                if unlocked_ops:
+                    await self._run_catchup_ops(unlocked_ops, None, deadlines)
+                await asyncio.gather(*(
+                    self._run_catchup_ops(ops, lock_entity_id, deadlines)
+                    for lock_entity_id, ops in groups.items()
+                ))
             except asyncio.CancelledError:
                 break
+
+    async def _run_catchup_ops(
+        self,
+        ops: list[tuple],
+        lock_entity_id: Optional[str],
+        deadlines: dict[Optional[str], float],
+    ) -> None:
+        """Run one lock's catch-up operations in order, staggered and backed off."""
+        for op_type, args in ops:
+            handler = self._catchup_dispatch.get(op_type)
+            if handler is None:
+                continue
+            # Stagger between operations to avoid overwhelming Z-Wave, and
+            # back off while operations keep failing
+            remaining = max(
+                deadlines.get(lock_entity_id, 0.0), self._backoff_until,
+            ) - monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+            deadlines[lock_entity_id] = monotonic() + self.CATCHUP_STAGGER
+            try:
+                await handler(*args)
             except Exception as e:
-                logger.error(f"Error in catch-up queue: {e}")
+                self._consecutive_failures += 1
+                failures = self._consecutive_failures
+                self._backoff_until = monotonic() + min(
+                    self.CATCHUP_MAX_BACKOFF, 2 ** min(failures, 16),
+                )
+                if failures == 1 or failures % self.CATCHUP_ERROR_LOG_EVERY == 0:
+                    logger.error(
+                        "Error in catch-up %s %s (%d consecutive failures): %s",
+                        op_type, args, failures, e,
+                    )
+            else:
+                if self._consecutive_failures:
+                    logger.info(
+                        "Catch-up queue recovered after %d failures",
+                        self._consecutive_failures,
+                    )
+                self._consecutive_failures = 0
+                self._backoff_until = 0.0
+
+    def _enqueue_catchup(self, op_type: str, args: tuple) -> None:
+        """Queue a past-due operation for the catch-up processor."""
+        self._catchup_deque.append((op_type, args))
+        self._catchup_event.set()
+        self._ensure_catchup_consumer()
+
+    def _ensure_catchup_consumer(self) -> None:
+        """Start the catch-up processor if it isn't running."""
+        if not self._scheduler.running:
+            return  # start() picks up anything queued before it
+        if self._catchup_task is None or self._catchup_task.done():
+            self._catchup_task = asyncio.create_task(self._process_catchup_queue())
 
     async def _handle_emergency_rotate(self) -> None:
         """Handle weekly emergency code rotation."""
@@ -185,9 +356,6 @@ class CodeScheduler:
         self, lock_entity_id: str, slot_number: int, code: str, booking_uid: str
     ) -> None:
         """Handle code activation."""
-        job_id = f"activate_{lock_entity_id}_{slot_number}_{booking_uid}"
-        if job_id in self._scheduled_jobs:
-            del self._scheduled_jobs[job_id]
 
         try:
             await self._on_activate(lock_entity_id, slot_number, code, booking_uid)
@@ -200,9 +368,6 @@ class CodeScheduler:
         self, lock_entity_id: str, slot_number: int, booking_uid: str
     ) -> None:
         """Handle code deactivation."""
-        job_id = f"deactivate_{lock_entity_id}_{slot_number}_{booking_uid}"
-        if job_id in self._scheduled_jobs:
-            del self._scheduled_jobs[job_id]
 
         try:
             await self._on_deactivate(lock_entity_id, slot_number, booking_uid)
@@ -213,9 +378,6 @@ class CodeScheduler:
 
     async def _handle_finalize(self, booking_uid: str, calendar_id: str, booking_id: int = 0) -> None:
         """Handle code finalization at 11am day before check-in."""
-        job_id = f"finalize_{booking_uid}"
-        if job_id in self._scheduled_jobs:
-            del self._scheduled_jobs[job_id]
 
         if self._on_code_finalize:
             try:
@@ -225,9 +387,6 @@ class CodeScheduler:
 
     async def _handle_whole_house_checkin(self, booking_uid: str) -> None:
         """Handle whole-house check-in (14:30 on check-in day)."""
-        job_id = f"wh_checkin_{booking_uid}"
-        if job_id in self._scheduled_jobs:
-            del self._scheduled_jobs[job_id]
 
         if self._on_whole_house_checkin:
             try:
@@ -237,9 +396,6 @@ class CodeScheduler:
 
     async def _handle_whole_house_checkout(self, booking_uid: str) -> None:
         """Handle whole-house check-out (11:30 on check-out day)."""
-        job_id = f"wh_checkout_{booking_uid}"
-        if job_id in self._scheduled_jobs:
-            del self._scheduled_jobs[job_id]
 
         if self._on_whole_house_checkout:
             try:
@@ -248,163 +404,152 @@ class CodeScheduler:
                 logger.error(f"Error in whole-house check-out routine for {booking_uid}: {e}")
 
     def schedule_whole_house(
-        self, booking_uid: str, check_in_date: "date", check_out_date: "date"
+        self,
+        booking_uid: str,
+        check_in_date: date,
+        check_out_date: date,
+        now: Optional[datetime] = None,
     ) -> tuple[str, str]:
         """Schedule whole-house check-in (14:30) and check-out (11:30) routines.
 
+        Args:
+            booking_uid: Booking UID
+            check_in_date: Check-in date
+            check_out_date: Check-out date
+            now: Current time; pass one value when scheduling a batch
+
         Returns:
             Tuple of (checkin_job_id, checkout_job_id)
         """
-        from datetime import date as date_type
-
-        now = datetime.now()
+        if now is None:
+            now = datetime.now()
 
         # Check-in: 14:30 on check-in day
         checkin_job_id = f"wh_checkin_{booking_uid}"
-        checkin_time = datetime.combine(check_in_date, datetime.min.time().replace(hour=14, minute=30))
+        checkin_time = datetime.combine(check_in_date, WH_CHECKIN_TIME)
 
         if checkin_time <= now:
-            self._catchup_queue.put_nowait(("wh_checkin", (booking_uid,)))
+            self._enqueue_catchup("wh_checkin", (booking_uid,))
         else:
-            self._scheduler.add_job(
-                self._handle_whole_house_checkin,
-                DateTrigger(run_date=checkin_time),
-                args=[booking_uid],
-                id=checkin_job_id,
-                replace_existing=True,
+            self._add_date_job(
+                checkin_job_id, checkin_time, "_handle_whole_house_checkin",
+                [booking_uid],
             )
-            self._scheduled_jobs[checkin_job_id] = ScheduledJob(
+            self._register_job(ScheduledJob(
                 job_id=checkin_job_id,
                 job_type=JobType.WHOLE_HOUSE_CHECKIN,
                 run_at=checkin_time,
                 booking_uid=booking_uid,
-            )
+            ))
 
         # Check-out: 11:30 on check-out day
         checkout_job_id = f"wh_checkout_{booking_uid}"
-        checkout_time = datetime.combine(check_out_date, datetime.min.time().replace(hour=11, minute=30))
+        checkout_time = datetime.combine(check_out_date, WH_CHECKOUT_TIME)
 
         if checkout_time <= now:
-            self._catchup_queue.put_nowait(("wh_checkout", (booking_uid,)))
+            self._enqueue_catchup("wh_checkout", (booking_uid,))
         else:
-            self._scheduler.add_job(
-                self._handle_whole_house_checkout,
-                DateTrigger(run_date=checkout_time),
-                args=[booking_uid],
-                id=checkout_job_id,
-                replace_existing=True,
+            self._add_date_job(
+                checkout_job_id, checkout_time, "_handle_whole_house_checkout",
+                [booking_uid],
             )
-            self._scheduled_jobs[checkout_job_id] = ScheduledJob(
+            self._register_job(ScheduledJob(
                 job_id=checkout_job_id,
                 job_type=JobType.WHOLE_HOUSE_CHECKOUT,
                 run_at=checkout_time,
                 booking_uid=booking_uid,
-            )
+            ))
 
         return checkin_job_id, checkout_job_id
 
     def schedule_whole_house_checkout_only(
-        self, booking_uid: str, check_out_date: "date"
+        self, booking_uid: str, check_out_date: date, now: Optional[datetime] = None,
     ) -> str:
         """Schedule only the whole-house check-out (auto-lock ON).
 
         Used during rehydration when the guest is already staying —
         we skip the check-in catchup to avoid unnecessary lock commands.
         """
-        now = datetime.now()
+        if now is None:
+            now = datetime.now()
 
         checkout_job_id = f"wh_checkout_{booking_uid}"
-        checkout_time = datetime.combine(
-            check_out_date, datetime.min.time().replace(hour=11, minute=30)
-        )
+        checkout_time = datetime.combine(check_out_date, WH_CHECKOUT_TIME)
 
         if checkout_time <= now:
-            self._catchup_queue.put_nowait(("wh_checkout", (booking_uid,)))
+            self._enqueue_catchup("wh_checkout", (booking_uid,))
         else:
-            self._scheduler.add_job(
-                self._handle_whole_house_checkout,
-                DateTrigger(run_date=checkout_time),
-                args=[booking_uid],
-                id=checkout_job_id,
-                replace_existing=True,
+            self._add_date_job(
+                checkout_job_id, checkout_time, "_handle_whole_house_checkout",
+                [booking_uid],
             )
-            self._scheduled_jobs[checkout_job_id] = ScheduledJob(
+            self._register_job(ScheduledJob(
                 job_id=checkout_job_id,
                 job_type=JobType.WHOLE_HOUSE_CHECKOUT,
                 run_at=checkout_time,
                 booking_uid=booking_uid,
-            )
+            ))
 
         return checkout_job_id
 
     def schedule_finalization(
         self, booking_uid: str, calendar_id: str, finalize_at: datetime,
-        booking_id: int = 0,
+        booking_id: int = 0, now: Optional[datetime] = None,
     ) -> str:
         """Schedule code finalization at 11am the day before check-in."""
         job_id = f"finalize_{booking_uid}"
-        now = datetime.now()
+        if now is None:
+            now = datetime.now()
 
         if finalize_at <= now:
             # Already past finalization time, queue for catch-up
-            self._catchup_queue.put_nowait((
-                "finalize", (booking_uid, calendar_id, booking_id),
-            ))
+            self._enqueue_catchup("finalize", (booking_uid, calendar_id, booking_id))
         else:
-            self._scheduler.add_job(
-                self._handle_finalize,
-                DateTrigger(run_date=finalize_at),
-                args=[booking_uid, calendar_id, booking_id],
-                id=job_id,
-                replace_existing=True,
+            self._add_date_job(
+                job_id, finalize_at, "_handle_finalize",
+                [booking_uid, calendar_id, booking_id],
             )
-            self._scheduled_jobs[job_id] = ScheduledJob(
+            self._register_job(ScheduledJob(
                 job_id=job_id,
                 job_type=JobType.SYNC_CHECK,
                 run_at=finalize_at,
                 booking_uid=booking_uid,
                 calendar_id=calendar_id,
-            )
+            ))
 
         return job_id
 
-    def schedule_code(self, entry: CodeScheduleEntry) -> tuple[str, str]:
+    def schedule_code(
+        self, entry: CodeScheduleEntry, now: Optional[datetime] = None,
+    ) -> tuple[str, str]:
         """Schedule a code activation and deactivation.
 
         Args:
             entry: The schedule entry
+            now: Current time; pass one value when scheduling a batch
 
         Returns:
             Tuple of (activate_job_id, deactivate_job_id)
         """
-        now = datetime.now()
+        if now is None:
+            now = datetime.now()
 
         # Schedule activation
-        activate_job_id = (
-            f"activate_{entry.lock_entity_id}_{entry.slot_number}_{entry.booking_uid}"
-        )
+        activate_id = activate_job_id(entry.lock_entity_id, entry.slot_number, entry.booking_uid)
 
         if entry.activate_at <= now:
             # Past-due: queue for sequential catch-up (avoids Z-Wave flooding)
-            self._catchup_queue.put_nowait((
+            self._enqueue_catchup(
                 "activate",
                 (entry.lock_entity_id, entry.slot_number, entry.code, entry.booking_uid),
-            ))
+            )
         else:
-            self._scheduler.add_job(
-                self._handle_activate,
-                DateTrigger(run_date=entry.activate_at),
-                args=[
-                    entry.lock_entity_id,
-                    entry.slot_number,
-                    entry.code,
-                    entry.booking_uid,
-                ],
-                id=activate_job_id,
-                replace_existing=True,
+            self._add_date_job(
+                activate_id, entry.activate_at, "_handle_activate",
+                [entry.lock_entity_id, entry.slot_number, entry.code, entry.booking_uid],
             )
-            self._scheduled_jobs[activate_job_id] = ScheduledJob(
-                job_id=activate_job_id,
+            self._register_job(ScheduledJob(
+                job_id=activate_id,
                 job_type=JobType.ACTIVATE_CODE,
                 run_at=entry.activate_at,
                 lock_entity_id=entry.lock_entity_id,
@@ -412,38 +557,62 @@ class CodeScheduler:
                 code=entry.code,
                 booking_uid=entry.booking_uid,
                 calendar_id=entry.calendar_id,
-            )
+            ))
 
         # Schedule deactivation
-        deactivate_job_id = (
-            f"deactivate_{entry.lock_entity_id}_{entry.slot_number}_{entry.booking_uid}"
+        deactivate_id = deactivate_job_id(
+            entry.lock_entity_id, entry.slot_number, entry.booking_uid,
         )
 
         if entry.deactivate_at <= now:
             # Past-due deactivation: queue for sequential catch-up
-            self._catchup_queue.put_nowait((
+            self._enqueue_catchup(
                 "deactivate",
                 (entry.lock_entity_id, entry.slot_number, entry.booking_uid),
-            ))
+            )
         else:
-            self._scheduler.add_job(
-                self._handle_deactivate,
-                DateTrigger(run_date=entry.deactivate_at),
-                args=[entry.lock_entity_id, entry.slot_number, entry.booking_uid],
-                id=deactivate_job_id,
-                replace_existing=True,
+            self._add_date_job(
+                deactivate_id, entry.deactivate_at, "_handle_deactivate",
+                [entry.lock_entity_id, entry.slot_number, entry.booking_uid],
             )
-            self._scheduled_jobs[deactivate_job_id] = ScheduledJob(
-                job_id=deactivate_job_id,
+            self._register_job(ScheduledJob(
+                job_id=deactivate_id,
                 job_type=JobType.DEACTIVATE_CODE,
                 run_at=entry.deactivate_at,
                 lock_entity_id=entry.lock_entity_id,
                 slot_number=entry.slot_number,
                 booking_uid=entry.booking_uid,
                 calendar_id=entry.calendar_id,
-            )
+            ))
+
+        return activate_id, deactivate_id
+
+    def schedule_codes_bulk(
+        self, entries: Iterable[CodeScheduleEntry], now: Optional[datetime] = None,
+    ) -> list[tuple[str, str]]:
+        """Schedule activations and deactivations for many entries at once.
 
-        return activate_job_id, deactivate_job_id
+        Job processing is paused while the jobs are added, so APScheduler
+        works out its next wakeup once on resume instead of once per job.
+
+        Args:
+            entries: The schedule entries
+            now: Current time; defaults to one value for the whole batch
+
+        Returns:
+            List of (activate_job_id, deactivate_job_id), one per entry
+        """
+        if now is None:
+            now = datetime.now()
+
+        pause = self._scheduler.state == STATE_RUNNING
+        if pause:
+            self._scheduler.pause()
+        try:
+            return [self.schedule_code(entry, now=now) for entry in entries]
+        finally:
+            if pause:
+                self._scheduler.resume()
 
     def schedule_deactivation_only(
         self,
@@ -451,6 +620,7 @@ class CodeScheduler:
         slot_number: int,
         booking_uid: str,
         deactivate_at: datetime,
+        now: Optional[datetime] = None,
     ) -> str:
         """Schedule only a deactivation (no activation).
 
@@ -462,44 +632,38 @@ class CodeScheduler:
             slot_number: Slot number
             booking_uid: Booking UID
             deactivate_at: When to deactivate
+            now: Current time; pass one value when scheduling a batch
 
         Returns:
             The deactivation job ID
         """
-        now = datetime.now()
+        if now is None:
+            now = datetime.now()
 
-        deactivate_job_id = (
-            f"deactivate_{lock_entity_id}_{slot_number}_{booking_uid}"
-        )
+        job_id = deactivate_job_id(lock_entity_id, slot_number, booking_uid)
 
         if deactivate_at <= now:
             # Past-due deactivation: queue for sequential catch-up
-            self._catchup_queue.put_nowait((
-                "deactivate",
-                (lock_entity_id, slot_number, booking_uid),
-            ))
+            self._enqueue_catchup("deactivate", (lock_entity_id, slot_number, booking_uid))
         else:
-            self._scheduler.add_job(
-                self._handle_deactivate,
-                DateTrigger(run_date=deactivate_at),
-                args=[lock_entity_id, slot_number, booking_uid],
-                id=deactivate_job_id,
-                replace_existing=True,
+            self._add_date_job(
+                job_id, deactivate_at, "_handle_deactivate",
+                [lock_entity_id, slot_number, booking_uid],
             )
-            self._scheduled_jobs[deactivate_job_id] = ScheduledJob(
-                job_id=deactivate_job_id,
+            self._register_job(ScheduledJob(
+                job_id=job_id,
                 job_type=JobType.DEACTIVATE_CODE,
                 run_at=deactivate_at,
                 lock_entity_id=lock_entity_id,
                 slot_number=slot_number,
                 booking_uid=booking_uid,
-            )
+            ))
 
         logger.info(
             f"Scheduled deactivation-only for {lock_entity_id} slot {slot_number} "
             f"at {deactivate_at} (code already active)"
         )
-        return deactivate_job_id
+        return job_id
 
     def cancel_job(self, job_id: str) -> bool:
         """Cancel a scheduled job.
@@ -512,8 +676,7 @@ class CodeScheduler:
         """
         try:
             self._scheduler.remove_job(job_id)
-            if job_id in self._scheduled_jobs:
-                del self._scheduled_jobs[job_id]
+            self._unregister_job(job_id)
             return True
         except Exception:
             return False
@@ -540,27 +703,40 @@ class CodeScheduler:
         Returns:
             The job ID
         """
-        job_id = f"activate_{lock_entity_id}_{slot_number}_{booking_uid}"
-
-        # Remove existing job if present
-        self.cancel_job(job_id)
+        job_id = activate_job_id(lock_entity_id, slot_number, booking_uid)
 
         now = datetime.now()
         if new_time <= now:
-            # Past-due: queue for sequential catch-up
-            self._catchup_queue.put_nowait((
-                "activate",
-                (lock_entity_id, slot_number, code, booking_uid),
-            ))
-        else:
-            self._scheduler.add_job(
-                self._handle_activate,
-                DateTrigger(run_date=new_time),
-                args=[lock_entity_id, slot_number, code, booking_uid],
-                id=job_id,
-                replace_existing=True,
+            # Past-due: drop any pending job and queue for sequential catch-up
+            self.cancel_job(job_id)
+            self._enqueue_catchup("activate", (lock_entity_id, slot_number, code, booking_uid))
+            return job_id
+
+        # Move the existing job in place rather than removing and re-adding it
+        job = self._scheduled_jobs.get(job_id)
+        try:
+            self._scheduler.reschedule_job(job_id, trigger=DateTrigger(run_date=new_time))
+            if job is None or job.code != code:
+                self._scheduler.modify_job(
+                    job_id,
+                    args=[
+                        self._id, "_handle_activate",
+                        lock_entity_id, slot_number, code, booking_uid,
+                    ],
+                )
+        except JobLookupError:
+            job = None
+            self._unregister_job(job_id)
+            self._add_date_job(
+                job_id, new_time, "_handle_activate",
+                [lock_entity_id, slot_number, code, booking_uid],
             )
-            self._scheduled_jobs[job_id] = ScheduledJob(
+
+        if job is not None:
+            job.run_at = new_time
+            job.code = code
+        else:
+            self._register_job(ScheduledJob(
                 job_id=job_id,
                 job_type=JobType.ACTIVATE_CODE,
                 run_at=new_time,
@@ -568,7 +744,7 @@ class CodeScheduler:
                 slot_number=slot_number,
                 code=code,
                 booking_uid=booking_uid,
-            )
+            ))
 
         return job_id
 
@@ -586,37 +762,104 @@ class CodeScheduler:
         Returns:
             The job ID
         """
-        job_id = f"deactivate_{lock_entity_id}_{slot_number}_{booking_uid}"
-
-        # Remove existing job if present
-        self.cancel_job(job_id)
+        job_id = deactivate_job_id(lock_entity_id, slot_number, booking_uid)
 
         now = datetime.now()
         if new_time <= now:
-            # Past-due: queue for sequential catch-up
-            self._catchup_queue.put_nowait((
-                "deactivate",
-                (lock_entity_id, slot_number, booking_uid),
-            ))
-        else:
-            self._scheduler.add_job(
-                self._handle_deactivate,
-                DateTrigger(run_date=new_time),
-                args=[lock_entity_id, slot_number, booking_uid],
-                id=job_id,
-                replace_existing=True,
+            # Past-due: drop any pending job and queue for sequential catch-up
+            self.cancel_job(job_id)
+            self._enqueue_catchup("deactivate", (lock_entity_id, slot_number, booking_uid))
+            return job_id
+
+        # Move the existing job in place rather than removing and re-adding it
+        job = self._scheduled_jobs.get(job_id)
+        try:
+            self._scheduler.reschedule_job(job_id, trigger=DateTrigger(run_date=new_time))
+        except JobLookupError:
+            job = None
+            self._unregister_job(job_id)
+            self._add_date_job(
+                job_id, new_time, "_handle_deactivate",
+                [lock_entity_id, slot_number, booking_uid],
             )
-            self._scheduled_jobs[job_id] = ScheduledJob(
+
+        if job is not None:
+            job.run_at = new_time
+        else:
+            self._register_job(ScheduledJob(
                 job_id=job_id,
                 job_type=JobType.DEACTIVATE_CODE,
                 run_at=new_time,
                 lock_entity_id=lock_entity_id,
                 slot_number=slot_number,
                 booking_uid=booking_uid,
-            )
+            ))
 
         return job_id
 
+    def _add_date_job(
+        self, job_id: str, run_at: datetime, handler_name: str, args: list,
+    ) -> None:
+        """Add a one-shot job, replacing any existing job with the same id.
+
+        Ids we aren't tracking are almost always new, so they are added
+        without APScheduler's replace_existing lookup (falling back to it on
+        a ConflictingIdError). Tracked ids are moved in place.
+        """
+        trigger = DateTrigger(run_date=run_at)
+        job_args = [self._id, handler_name, *args]
+        if job_id in self._scheduled_jobs:
+            try:
+                self._scheduler.reschedule_job(job_id, trigger=trigger)
+                self._scheduler.modify_job(job_id, args=job_args)
+                return
+            except JobLookupError:
+                pass
+        elif self._scheduler.running:
+            # Before start() APScheduler only queues jobs and checks ids later
+            try:
+                self._scheduler.add_job(_run_job, trigger, args=job_args, id=job_id)
+                return
+            except ConflictingIdError:
+                pass
+        self._scheduler.add_job(
+            _run_job, trigger, args=job_args, id=job_id, replace_existing=True,
+        )
+
+    def _on_job_event(self, event: JobEvent) -> None:
+        """Stop tracking a job once it has run or been removed."""
+        # One-shot jobs are removed when they fire, so by the time a run
+        # finishes the same id may have been scheduled again
+        if self._scheduler.get_job(event.job_id) is None:
+            self._unregister_job(event.job_id)
+
+    def _register_job(self, job: ScheduledJob) -> None:
+        """Track a scheduled job and index it by lock and booking."""
+        self._scheduled_jobs[job.job_id] = job
+        if job.lock_entity_id:
+            self._jobs_by_lock[job.lock_entity_id].add(job.job_id)
+        if job.booking_uid:
+            self._jobs_by_booking[job.booking_uid].add(job.job_id)
+
+    def _unregister_job(self, job_id: str) -> Optional[ScheduledJob]:
+        """Stop tracking a job and drop it from the indexes.
+
+        Returns:
+            The removed job, or None if it wasn't tracked
+        """
+        job = self._scheduled_jobs.pop(job_id, None)
+        if job is None:
+            return None
+        for index, key in (
+            (self._jobs_by_lock, job.lock_entity_id),
+            (self._jobs_by_booking, job.booking_uid),
+        ):
+            if key and key in index:
+                index[key].discard(job_id)
+                if not index[key]:
+                    del index[key]
+        return job
+
     def get_scheduled_jobs(self) -> list[ScheduledJob]:
         """Get all scheduled jobs.
 
@@ -635,9 +878,8 @@ class CodeScheduler:
             List of ScheduledJob objects for that lock
         """
         return [
-            job
-            for job in self._scheduled_jobs.values()
-            if job.lock_entity_id == lock_entity_id
+            self._scheduled_jobs[job_id]
+            for job_id in self._jobs_by_lock.get(lock_entity_id, ())
         ]
 
     def get_jobs_for_booking(self, booking_uid: str) -> list[ScheduledJob]:
@@ -650,7 +892,6 @@ class CodeScheduler:
             List of ScheduledJob objects for that booking
         """
         return [
-            job
-            for job in self._scheduled_jobs.values()
-            if job.booking_uid == booking_uid
+            self._scheduled_jobs[job_id]
+            for job_id in self._jobs_by_booking.get(booking_uid, ())
         ]
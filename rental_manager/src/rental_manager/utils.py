@@ -0,0 +1,26 @@
+"""Small helpers shared across layers."""
+
+from typing import Optional
+
+
+class _DigitsOnly(dict):
+    """str.translate table that keeps decimal digits and drops everything else.
+
+    Entries are filled in lazily, so each character (including non-ASCII
+    digits) is classified once and then looked up from C.
+    """
+
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        keep = codepoint if chr(codepoint).isdecimal() else None
+        self[codepoint] = keep
+        return keep
+
+
+_NON_DIGITS = _DigitsOnly()
+
+
+def digits_only(text: str) -> str:
+    """Strip everything but decimal digits from a string."""
+    if text.isdecimal():
+        return text
+    return text.translate(_NON_DIGITS)
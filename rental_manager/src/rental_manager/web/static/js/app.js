@@ -38,7 +38,11 @@ async function api(endpoint, options = {}) {
 
     if (!response.ok) {
         const error = await response.json().catch(() => ({ detail: 'Unknown error' }));
-        throw new Error(error.detail || 'API request failed');
+        // Request validation errors (422) carry a list of {loc, msg, ...}
+        const detail = Array.isArray(error.detail)
+            ? error.detail.map(e => e.msg).join('; ')
+            : error.detail;
+        throw new Error(detail || 'API request failed');
     }
 
     return response.json();
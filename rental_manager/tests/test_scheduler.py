@@ -0,0 +1,133 @@
+"""Tests for CodeScheduler catch-up and job tracking."""
+
+import asyncio
+from datetime import datetime, timedelta
+from time import monotonic
+
+import pytest
+
+from rental_manager.scheduler.scheduler import (
+    CodeScheduleEntry,
+    CodeScheduler,
+    activate_job_id,
+)
+
+LOCK = "lock.front_door"
+
+
+class Recorder:
+    """Scheduler callbacks that record the order they were called in."""
+
+    def __init__(self):
+        self.calls: list[tuple] = []
+
+    async def on_activate(self, lock_entity_id, slot_number, code, booking_uid):
+        self.calls.append(("activate", lock_entity_id, slot_number, booking_uid))
+
+    async def on_deactivate(self, lock_entity_id, slot_number, booking_uid):
+        self.calls.append(("deactivate", lock_entity_id, slot_number, booking_uid))
+
+    async def on_calendar_poll(self):
+        pass
+
+    async def on_code_finalize(self, booking_uid, calendar_id, booking_id=0):
+        self.calls.append(("finalize", booking_uid))
+
+
+@pytest.fixture
+async def recorder_scheduler():
+    recorder = Recorder()
+    scheduler = CodeScheduler(
+        on_activate=recorder.on_activate,
+        on_deactivate=recorder.on_deactivate,
+        on_calendar_poll=recorder.on_calendar_poll,
+        on_code_finalize=recorder.on_code_finalize,
+        poll_interval_seconds=3600,
+    )
+    scheduler.CATCHUP_STAGGER = 0
+    scheduler.start()
+    yield recorder, scheduler
+    await scheduler.stop()
+
+
+def make_entry(slot_number: int, booking_uid: str, activate_at, deactivate_at, code="1234"):
+    return CodeScheduleEntry(
+        lock_entity_id=LOCK,
+        slot_number=slot_number,
+        code=code,
+        activate_at=activate_at,
+        deactivate_at=deactivate_at,
+        booking_uid=booking_uid,
+        calendar_id="cal-1",
+        guest_name="Guest",
+    )
+
+
+async def wait_until(predicate, timeout: float = 3.0) -> None:
+    deadline = monotonic() + timeout
+    while not predicate():
+        assert monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+async def test_past_due_ops_run_in_order_with_finalize_first(recorder_scheduler):
+    recorder, scheduler = recorder_scheduler
+    now = datetime.now()
+    past = now - timedelta(hours=1)
+    future = now + timedelta(days=1)
+
+    scheduler.schedule_codes_bulk([
+        make_entry(1, "booking-a", past, future),
+        make_entry(2, "booking-b", past, past),
+    ], now=now)
+    scheduler.schedule_finalization("booking-c", "cal-1", past, now=now)
+
+    await wait_until(lambda: len(recorder.calls) == 4)
+
+    assert recorder.calls == [
+        ("finalize", "booking-c"),
+        ("activate", LOCK, 1, "booking-a"),
+        ("activate", LOCK, 2, "booking-b"),
+        ("deactivate", LOCK, 2, "booking-b"),
+    ]
+    # Only the future deactivation became a job
+    assert scheduler.get_jobs_for_lock(LOCK)[0].booking_uid == "booking-a"
+
+
+async def test_rescheduling_moves_existing_job_in_place(recorder_scheduler):
+    _, scheduler = recorder_scheduler
+    now = datetime.now()
+    first = now + timedelta(days=1)
+    second = now + timedelta(days=2)
+    job_id = activate_job_id(LOCK, 1, "booking-a")
+
+    scheduler.schedule_code(make_entry(1, "booking-a", first, second + timedelta(days=1)))
+    job = scheduler._scheduler.get_job(job_id)
+
+    scheduler.schedule_code(
+        make_entry(1, "booking-a", second, second + timedelta(days=1), code="5678")
+    )
+
+    moved = scheduler._scheduler.get_job(job_id)
+    assert moved is not None
+    assert moved.id == job.id
+    assert moved.trigger.run_date.replace(tzinfo=None) == second
+    assert tuple(moved.args[-2:]) == ("5678", "booking-a")
+    assert [j.id for j in scheduler._scheduler.get_jobs()].count(job_id) == 1
+
+
+async def test_fired_jobs_are_dropped_from_indexes(recorder_scheduler):
+    recorder, scheduler = recorder_scheduler
+    now = datetime.now()
+
+    scheduler.schedule_code(make_entry(
+        1, "booking-a", now + timedelta(seconds=0.1), now + timedelta(seconds=0.2),
+    ))
+    assert scheduler.get_jobs_for_lock(LOCK)
+    assert scheduler.get_jobs_for_booking("booking-a")
+
+    await wait_until(lambda: len(recorder.calls) == 2 and not scheduler.get_scheduled_jobs())
+
+    assert [call[0] for call in recorder.calls] == ["activate", "deactivate"]
+    assert not scheduler._jobs_by_lock
+    assert not scheduler._jobs_by_booking
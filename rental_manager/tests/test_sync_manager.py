@@ -0,0 +1,150 @@
+"""Tests for SyncManager timeouts, retries and shutdown."""
+
+import asyncio
+from time import monotonic
+
+from rental_manager.core.sync_manager import SyncManager, SyncState
+
+LOCK = "lock.front_door"
+SLOT = 3
+
+
+class FakeLock:
+    """Records lock operations; set_code fails for the first `fail_sets` calls."""
+
+    def __init__(self, fail_sets: int = 0):
+        self.fail_sets = fail_sets
+        self.set_calls: list[tuple[str, int, str]] = []
+        self.clear_calls: list[tuple[str, int]] = []
+        self.ping_calls: list[str] = []
+        self.failures: list[tuple[str, int, str, str]] = []
+
+    async def set_code(self, lock_entity_id: str, slot_number: int, code: str) -> None:
+        self.set_calls.append((lock_entity_id, slot_number, code))
+        if len(self.set_calls) <= self.fail_sets:
+            raise RuntimeError("Z-Wave timeout")
+
+    async def clear_code(self, lock_entity_id: str, slot_number: int) -> None:
+        self.clear_calls.append((lock_entity_id, slot_number))
+
+    async def ping_lock(self, lock_entity_id: str) -> bool:
+        self.ping_calls.append(lock_entity_id)
+        return True
+
+    async def on_sync_failed(
+        self, lock_entity_id: str, slot_number: int, code: str, error: str
+    ) -> None:
+        self.failures.append((lock_entity_id, slot_number, code, error))
+
+
+def make_manager(lock: FakeLock, **kwargs) -> SyncManager:
+    kwargs.setdefault("timeout_seconds", 0.05)
+    kwargs.setdefault("base_delay", 0.01)
+    kwargs.setdefault("jitter", 0.0)
+    return SyncManager(
+        set_code=lock.set_code,
+        clear_code=lock.clear_code,
+        ping_lock=lock.ping_lock,
+        on_sync_failed=lock.on_sync_failed,
+        **kwargs,
+    )
+
+
+async def wait_until(predicate, timeout: float = 2.0) -> None:
+    deadline = monotonic() + timeout
+    while not predicate():
+        assert monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+async def test_set_timeout_retries_then_succeeds():
+    lock = FakeLock(fail_sets=1)
+    manager = make_manager(lock)
+    manager.start()
+    try:
+        result = await manager.set_code(LOCK, SLOT, "1234", "booking-1")
+        assert not result.success
+
+        slot = manager.get_slot_state(LOCK, SLOT)
+        await wait_until(lambda: slot.state == SyncState.ACTIVE)
+
+        assert slot.retry_count == 1
+        assert slot.current_code == "1234"
+        assert slot.last_error is None
+        assert lock.ping_calls == [LOCK]
+        assert lock.clear_calls == [(LOCK, SLOT)]
+        assert lock.set_calls == [(LOCK, SLOT, "1234")] * 2
+        assert not manager.get_syncing_slots()
+    finally:
+        await manager.stop()
+
+
+async def test_max_retries_marks_failed_and_fires_callback():
+    lock = FakeLock(fail_sets=100)
+    manager = make_manager(lock, max_retries=2)
+    manager.start()
+    try:
+        await manager.set_code(LOCK, SLOT, "1234", "booking-1")
+
+        await wait_until(lambda: lock.failures)
+
+        slot = manager.get_slot_state(LOCK, SLOT)
+        assert slot.state == SyncState.FAILED
+        assert slot.retry_count == 2
+        assert manager.get_failed_slots() == [slot]
+        assert lock.failures == [(LOCK, SLOT, "1234", "Max retries (2) exceeded")]
+        # The original attempt plus one re-set per retry
+        assert len(lock.set_calls) == 3
+    finally:
+        await manager.stop()
+
+
+async def test_superseded_deadline_is_ignored():
+    lock = FakeLock(fail_sets=100)
+    manager = make_manager(lock)
+
+    await manager.set_code(LOCK, SLOT, "1234", "booking-1")
+    slot = manager.get_slot_state(LOCK, SLOT)
+    stale_gen = slot.gen
+    await asyncio.sleep(0.1)
+
+    # A new set replaces the now-due timeout with one in the future
+    await manager.set_code(LOCK, SLOT, "5678", "booking-2")
+    assert slot.gen != stale_gen
+    assert len(manager._deadlines) == 2
+
+    await manager._check_timeouts()
+
+    assert slot.state == SyncState.SETTING
+    assert slot.retry_count == 0
+    assert lock.ping_calls == []
+    assert [gen for _, _, gen in manager._deadlines] == [slot.gen]
+
+
+async def test_stop_cancels_pending_work():
+    lock = FakeLock(fail_sets=100)
+    ping_started = asyncio.Event()
+    cancelled: list[str] = []
+
+    async def hanging_ping(lock_entity_id: str) -> bool:
+        ping_started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(lock_entity_id)
+            raise
+        return True
+
+    lock.ping_lock = hanging_ping
+    manager = make_manager(lock)
+    manager.start()
+    check_task = manager._check_task
+
+    await manager.set_code(LOCK, SLOT, "1234", "booking-1")
+    await asyncio.wait_for(ping_started.wait(), timeout=2.0)
+
+    await manager.stop(timeout=1.0)
+
+    assert check_task.done()
+    assert manager._check_task is None
+    assert cancelled == [LOCK]